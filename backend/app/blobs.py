@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import hashlib
+
+from redis.asyncio import Redis as AsyncRedis
+
+# upload-blob:<sha256> maps identical upload bytes to the single stored object, recorded only once that
+# object is durable. upload-blob-refs:<sha256> holds the references keeping it alive: upload records
+# and the video jobs reading it. A reference that lives no longer than its record also sits in
+# EXPIRY_KEY, so references of expired records are dropped by the next claim or release and the
+# object is freed with the last one. The scripts build per-blob keys themselves, so a Redis Cluster
+# would need every key in one slot.
+EXPIRY_KEY = "upload-blob:expiry"
+# Expired references dropped per script call, so one call never blocks Redis for long.
+SWEEP_LIMIT = 100
+
+_RELEASE_FUNCTION = """
+local function release(sha256, ref)
+    local refs_key = 'upload-blob-refs:' .. sha256
+    redis.call('ZREM', KEYS[1], sha256 .. '|' .. ref)
+    redis.call('SREM', refs_key, ref)
+    if redis.call('SCARD', refs_key) > 0 then
+        return false
+    end
+    local blob_key = 'upload-blob:' .. sha256
+    local object_key = redis.call('HGET', blob_key, 'object_key')
+    redis.call('DEL', blob_key)
+    return object_key
+end
+
+local function sweep(now, limit)
+    local orphaned = {}
+    for _, entry in ipairs(redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', now, 'LIMIT', 0, limit)) do
+        local separator = string.find(entry, '|', 1, true)
+        local object_key = release(string.sub(entry, 1, separator - 1), string.sub(entry, separator + 1))
+        if object_key then
+            table.insert(orphaned, object_key)
+        end
+    end
+    return orphaned
+end
+"""
+
+# Returns {stored object key or '', orphaned object keys...}. An empty object_key only adds the
+# reference when the bytes are already stored.
+_CLAIM_SCRIPT = _RELEASE_FUNCTION + """
+local orphaned = sweep(ARGV[4], tonumber(ARGV[7]))
+local blob_key = 'upload-blob:' .. ARGV[1]
+local existing = redis.call('HGET', blob_key, 'object_key')
+if not existing then
+    if ARGV[5] == '' then
+        return {'', unpack(orphaned)}
+    end
+    redis.call('HSET', blob_key, 'object_key', ARGV[5], 'size_bytes', ARGV[6])
+end
+redis.call('SADD', 'upload-blob-refs:' .. ARGV[1], ARGV[2])
+if ARGV[3] ~= '' then
+    redis.call('ZADD', KEYS[1], ARGV[3], ARGV[1] .. '|' .. ARGV[2])
+end
+return {existing or '', unpack(orphaned)}
+"""
+
+_RELEASE_SCRIPT = _RELEASE_FUNCTION + """
+local orphaned = sweep(ARGV[3], tonumber(ARGV[4]))
+local object_key = release(ARGV[1], ARGV[2])
+if object_key then
+    table.insert(orphaned, object_key)
+end
+return orphaned
+"""
+
+
+def object_blob_id(object_key: str) -> str:
+    # Presigned uploads never pass through the backend, so there is no content hash to share them by; their
+    # object is counted under an id of its own key instead, hashed so it never contains the '|' separator.
+    return "object-" + hashlib.sha256(object_key.encode("utf-8")).hexdigest()
+
+
+def _decode(value: bytes | str) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+async def claim_blob(
+    redis_client: AsyncRedis,
+    sha256: str,
+    ref: str,
+    expires_at: float | None,
+    now: float,
+    object_key: str = "",
+    size_bytes: int = 0,
+) -> tuple[str | None, list[str]]:
+    # Returns (the already stored object for these bytes, objects whose last reference expired). With
+    # object_key, None means object_key became the stored copy; without it, that nothing is stored.
+    stored, *orphaned = await redis_client.eval(
+        _CLAIM_SCRIPT,
+        1,
+        EXPIRY_KEY,
+        sha256,
+        ref,
+        "" if expires_at is None else expires_at,
+        now,
+        object_key,
+        size_bytes,
+        SWEEP_LIMIT,
+    )
+    return _decode(stored) or None, [_decode(key) for key in orphaned]
+
+
+async def release_blob(redis_client: AsyncRedis, sha256: str, ref: str, now: float) -> list[str]:
+    # Returns the objects whose last reference is gone and that can be deleted.
+    orphaned = await redis_client.eval(_RELEASE_SCRIPT, 1, EXPIRY_KEY, sha256, ref, now, SWEEP_LIMIT)
+    return [_decode(key) for key in orphaned]
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+from collections import defaultdict
+from collections.abc import AsyncIterator, Callable
+
+from redis.asyncio import Redis as AsyncRedis
+from redis.asyncio.client import PubSub
+from redis.exceptions import RedisError
+
+from common.job_store import JOB_EVENTS_CHANNEL_PREFIX, get_jobs_async
+
+# Turns a job record into the payload sent to SSE clients, once per update rather than once per client.
+EventRenderer = Callable[[str, dict[str, str]], str]
+RECONNECT_MIN_DELAY_SECONDS = 0.5
+RECONNECT_MAX_DELAY_SECONDS = 30.0
+
+
+class JobEventBroker:
+    # One pattern subscription per process fans out to every SSE client, so Redis sees a single
+    # subscriber no matter how many browsers are watching.
+    def __init__(self, redis_client: AsyncRedis, buffer_size: int, render: EventRenderer) -> None:
+        self._redis = redis_client
+        self._buffer_size = buffer_size
+        self._render = render
+        self._subscribers: dict[str, set[asyncio.Queue[str]]] = defaultdict(set)
+        self._task: asyncio.Task[None] | None = None
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+
+    async def _run(self) -> None:
+        delay = RECONNECT_MIN_DELAY_SECONDS
+        reconnecting = False
+        while True:
+            try:
+                async with self._redis.pubsub(ignore_subscribe_messages=True) as pubsub:
+                    await pubsub.psubscribe(f"{JOB_EVENTS_CHANNEL_PREFIX}*")
+                    if reconnecting:
+                        # Updates published while disconnected are gone; resend the current state instead.
+                        await self._resync()
+                    delay = RECONNECT_MIN_DELAY_SECONDS
+                    await self._dispatch(pubsub)
+            except (RedisError, OSError):
+                pass
+            reconnecting = True
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX_DELAY_SECONDS)
+
+    async def _dispatch(self, pubsub: PubSub) -> None:
+        async for message in pubsub.listen():
+            job_id = message["channel"].decode()[len(JOB_EVENTS_CHANNEL_PREFIX) :]
+            # Every job's updates arrive here; only decode those someone in this process is watching.
+            if job_id in self._subscribers:
+                self._deliver(job_id, json.loads(message["data"]))
+
+    async def _resync(self) -> None:
+        job_ids = list(self._subscribers)
+        for job_id, job in zip(job_ids, await get_jobs_async(self._redis, job_ids)):
+            if job:
+                self._deliver(job_id, job)
+
+    def _deliver(self, job_id: str, job: dict[str, str]) -> None:
+        queues = tuple(self._subscribers.get(job_id, ()))
+        if not queues:
+            return
+        payload = self._render(job_id, job)
+        for queue in queues:
+            if queue.full():
+                # A slow client loses the oldest update rather than stalling everyone else.
+                queue.get_nowait()
+            queue.put_nowait(payload)
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    @contextlib.asynccontextmanager
+    async def subscribe(self, job_id: str) -> AsyncIterator[asyncio.Queue[str]]:
+        queue: asyncio.Queue[str] = asyncio.Queue(maxsize=self._buffer_size)
+        self._subscribers[job_id].add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers[job_id].discard(queue)
+            if not self._subscribers[job_id]:
+                del self._subscribers[job_id]
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any
+
+from redis.asyncio import Redis as AsyncRedis
+
+# job-fingerprint:<sha256> points at the video job that renders a given set of inputs. Replacing it
+# is a compare-and-set so two identical submissions racing each other still enqueue only one render.
+_SWAP_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if (current or '') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+
+def _fingerprint_key(fingerprint: str) -> str:
+    return f"job-fingerprint:{fingerprint}"
+
+
+def job_fingerprint(**inputs: Any) -> str:
+    canonical = json.dumps(inputs, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+async def get_fingerprint_job(redis_client: AsyncRedis, fingerprint: str) -> str:
+    job_id = await redis_client.get(_fingerprint_key(fingerprint))
+    if job_id is None:
+        return ""
+    return job_id.decode() if isinstance(job_id, bytes) else str(job_id)
+
+
+async def swap_fingerprint_job(
+    redis_client: AsyncRedis,
+    fingerprint: str,
+    expected_job_id: str,
+    job_id: str,
+    ttl_seconds: int,
+) -> bool:
+    # False means another submission claimed the fingerprint since expected_job_id was read.
+    swapped = await redis_client.eval(
+        _SWAP_SCRIPT, 1, _fingerprint_key(fingerprint), expected_job_id, job_id, max(1, ttl_seconds)
+    )
+    return bool(swapped)
@@ -1,84 +1,464 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
+import math
+import time
 import uuid
+from collections.abc import AsyncIterator
 from datetime import datetime, timezone
 
-import boto3
-from botocore.client import Config
-from fastapi import FastAPI, File, HTTPException, UploadFile
+from botocore.exceptions import ClientError
+from fastapi import FastAPI, File, Header, HTTPException, Query, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from redis import Redis
-from rq import Queue
-from rq.retry import Retry
+from redis.asyncio import BlockingConnectionPool
+from redis.asyncio import Redis as AsyncRedis
+from rq import Queue, Retry
 
 from backend.models import JobStatus
 from common.config import (
+    ADMISSION_GLOBAL_MAX_BACKLOG_SECONDS,
+    ADMISSION_TENANT_MAX_BACKLOG_SECONDS,
+    BACKEND_REDIS_MAX_CONNECTIONS,
+    BACKEND_REDIS_POOL_TIMEOUT_SECONDS,
+    BACKEND_S3_MAX_CONNECTIONS,
+    JOB_DEDUP_ENABLED,
+    JOB_DEDUP_RETENTION_SECONDS,
+    JOB_EVENTS_KEEPALIVE_SECONDS,
+    JOB_FINISHED_TTL_SECONDS,
+    JOB_EVENTS_SUBSCRIBER_BUFFER,
     JOB_MAX_TIMEOUT_SECONDS,
+    JOB_STATUS_BULK_LIMIT,
     MINIO_ACCESS_KEY,
     MINIO_BUCKET,
     MINIO_ENDPOINT,
     MINIO_SECRET_KEY,
+    PRESIGN_EXPIRES_SECONDS,
+    PRESIGN_MULTIPART_THRESHOLD_BYTES,
     PUBLIC_BASE_URL,
     REDIS_URL,
+    RESULT_URL_EXPIRES_SECONDS,
+    UPLOAD_MAX_BYTES,
+    UPLOAD_PART_SIZE_BYTES,
+    UPLOAD_TTL_SECONDS,
 )
-from common.job_store import get_job, set_job
-from .schemas import JobCreateRequest, JobCreateResponse, JobResultResponse, JobStatusResponse
+from common.admission import (
+    count_workers_async,
+    get_backlog_seconds_async,
+    release_backlog_async,
+    reserve_backlog_async,
+)
+from common.job_store import (
+    FINISHED_STATUSES,
+    delete_job_async,
+    get_hls_segments_async,
+    get_job_async,
+    get_job_timings_async,
+    get_jobs_async,
+    set_job_async,
+    update_job_async,
+)
+from common.scheduling import (
+    QUEUE_NAMES,
+    SHORT_QUEUE,
+    estimate_render_cost,
+    estimate_segment_count,
+    queue_for_cost,
+)
+from common.throughput import estimate_render_seconds_async
+from .blobs import claim_blob, object_blob_id, release_blob
+from .events import JobEventBroker
+from .fingerprints import get_fingerprint_job, job_fingerprint, swap_fingerprint_job
+from .metrics import (
+    BACKLOG_SECONDS,
+    JOBS_COALESCED,
+    JOBS_REJECTED,
+    JOBS_SUBMITTED,
+    QUEUE_DEPTH,
+    QUEUE_FAILED,
+    QUEUE_RUNNING,
+    WORKERS,
+)
+from .playlists import PLAYLIST_CONTENT_TYPE, build_event_playlist, ready_segments
+from .schemas import (
+    JobCreateRequest,
+    JobCreateResponse,
+    JobResultResponse,
+    JobStatusListResponse,
+    JobStatusResponse,
+    JobTimingsResponse,
+    PresignedPart,
+    UploadCompleteRequest,
+    UploadPresignRequest,
+    UploadPresignResponse,
+    UploadStatusResponse,
+)
+from .storage import ObjectStorage
 
 app = FastAPI(title="Video Generation Backend")
 
-redis_client = Redis.from_url(REDIS_URL)
-queue = Queue("video", connection=redis_client)
-
-s3_client = boto3.client(
-    "s3",
-    endpoint_url=MINIO_ENDPOINT,
-    aws_access_key_id=MINIO_ACCESS_KEY,
-    aws_secret_access_key=MINIO_SECRET_KEY,
-    config=Config(signature_version="s3v4"),
-    region_name="us-east-1",
+redis_client = AsyncRedis(
+    connection_pool=BlockingConnectionPool.from_url(
+        REDIS_URL,
+        max_connections=BACKEND_REDIS_MAX_CONNECTIONS,
+        timeout=BACKEND_REDIS_POOL_TIMEOUT_SECONDS,
+    )
 )
+# RQ only speaks the synchronous client; enqueues run on the threadpool so they never block the loop.
+queue_connection = Redis.from_url(REDIS_URL)
+queues = {name: Queue(name, connection=queue_connection) for name in QUEUE_NAMES}
+job_events = JobEventBroker(
+    redis_client,
+    buffer_size=JOB_EVENTS_SUBSCRIBER_BUFFER,
+    render=lambda job_id, job: _build_status_response(job_id, job).model_dump_json(),
+)
+storage = ObjectStorage(MINIO_ENDPOINT, MINIO_ACCESS_KEY, MINIO_SECRET_KEY, max_connections=BACKEND_S3_MAX_CONNECTIONS)
+# Signs URLs for the host clients can reach; signing is local, so this client never opens a connection.
+public_storage = ObjectStorage(PUBLIC_BASE_URL, MINIO_ACCESS_KEY, MINIO_SECRET_KEY, max_connections=1)
 
 
-def ensure_bucket() -> None:
-    existing = [bucket["Name"] for bucket in s3_client.list_buckets().get("Buckets", [])]
+async def ensure_bucket() -> None:
+    buckets = await storage.client.list_buckets()
+    existing = [bucket["Name"] for bucket in buckets.get("Buckets", [])]
     if MINIO_BUCKET not in existing:
-        s3_client.create_bucket(Bucket=MINIO_BUCKET)
+        await storage.client.create_bucket(Bucket=MINIO_BUCKET)
 
 
 @app.on_event("startup")
-def startup_event() -> None:
-    ensure_bucket()
+async def startup_event() -> None:
+    await storage.start()
+    await public_storage.start()
+    await ensure_bucket()
+    await job_events.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event() -> None:
+    await job_events.stop()
+    await storage.stop()
+    await public_storage.stop()
+    await redis_client.aclose()
+
+
+async def _delete_objects(object_keys: list[str]) -> None:
+    for object_key in object_keys:
+        await storage.client.delete_object(Bucket=MINIO_BUCKET, Key=object_key)
+
+
+async def _claim_blob(
+    sha256: str,
+    ref: str,
+    expires_at: float | None,
+    object_key: str = "",
+    size_bytes: int = 0,
+) -> str | None:
+    existing_key, orphaned = await claim_blob(
+        redis_client, sha256, ref, expires_at, time.time(), object_key=object_key, size_bytes=size_bytes
+    )
+    await _delete_objects(orphaned)
+    return existing_key
+
+
+async def _release_blob(sha256: str, ref: str) -> None:
+    await _delete_objects(await release_blob(redis_client, sha256, ref, time.time()))
+
+
+async def _record_blob(
+    sha256: str,
+    upload_job_id: str,
+    expires_at: float | None,
+    object_key: str,
+    size_bytes: int,
+) -> tuple[str, bool]:
+    # The object is durable by now; an identical upload racing this one may have been recorded first.
+    try:
+        existing_key = await _claim_blob(sha256, upload_job_id, expires_at, object_key, size_bytes)
+    except BaseException:
+        await storage.client.delete_object(Bucket=MINIO_BUCKET, Key=object_key)
+        raise
+    if existing_key:
+        await storage.client.delete_object(Bucket=MINIO_BUCKET, Key=object_key)
+        return existing_key, True
+    return object_key, False
+
+
+def _upload_blob_id(upload_job: dict[str, str]) -> str:
+    # The blob whose references keep this upload's object alive; empty until the object exists.
+    return upload_job.get("sha256") or upload_job.get("blob_id", "")
+
+
+async def _store_upload(
+    file: UploadFile,
+    object_key: str,
+    upload_job_id: str,
+    expires_at: float | None,
+) -> tuple[str, int, str, bool]:
+    # Returns (sha256, size_bytes, stored object key, deduplicated).
+    if file.size is not None and file.size > UPLOAD_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"file exceeds {UPLOAD_MAX_BYTES} bytes")
+
+    content_type = file.content_type or "application/octet-stream"
+    chunk = await file.read(UPLOAD_PART_SIZE_BYTES)
+    if not chunk:
+        raise HTTPException(status_code=400, detail="file is empty")
+    # One byte of lookahead tells a single-part file apart without holding a second part in memory.
+    lookahead = await file.read(1)
+    # file.size is unknown for some clients, and the cap may be smaller than one part.
+    if len(chunk) + len(lookahead) > UPLOAD_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"file exceeds {UPLOAD_MAX_BYTES} bytes")
+
+    if not lookahead:
+        # The whole file fits in one part, so a stored duplicate is known before anything is written.
+        sha256 = hashlib.sha256(chunk).hexdigest()
+        existing_key = await _claim_blob(sha256, upload_job_id, expires_at)
+        if existing_key:
+            return sha256, len(chunk), existing_key, True
+        await storage.client.put_object(Bucket=MINIO_BUCKET, Key=object_key, Body=chunk, ContentType=content_type)
+        stored_key, deduplicated = await _record_blob(sha256, upload_job_id, expires_at, object_key, len(chunk))
+        return sha256, len(chunk), stored_key, deduplicated
+
+    digest = hashlib.sha256()
+    size_bytes = 0
+    parts: list[dict[str, str | int]] = []
+    multipart = await storage.client.create_multipart_upload(
+        Bucket=MINIO_BUCKET, Key=object_key, ContentType=content_type
+    )
+    try:
+        # Only one part is held in memory at a time; the SHA-256 and size are taken on the way through.
+        while chunk:
+            size_bytes += len(chunk)
+            if size_bytes > UPLOAD_MAX_BYTES:
+                raise HTTPException(status_code=413, detail=f"file exceeds {UPLOAD_MAX_BYTES} bytes")
+            digest.update(chunk)
+            part_number = len(parts) + 1
+            uploaded = await storage.client.upload_part(
+                Bucket=MINIO_BUCKET,
+                Key=object_key,
+                UploadId=multipart["UploadId"],
+                PartNumber=part_number,
+                Body=chunk,
+            )
+            parts.append({"ETag": uploaded["ETag"], "PartNumber": part_number})
+            chunk = lookahead + await file.read(UPLOAD_PART_SIZE_BYTES - len(lookahead))
+            lookahead = b""
+
+        sha256 = digest.hexdigest()
+        existing_key = await _claim_blob(sha256, upload_job_id, expires_at)
+        if existing_key:
+            # Same bytes are already stored: drop the staged parts instead of committing a second copy.
+            await storage.client.abort_multipart_upload(
+                Bucket=MINIO_BUCKET, Key=object_key, UploadId=multipart["UploadId"]
+            )
+            return sha256, size_bytes, existing_key, True
+
+        await storage.client.complete_multipart_upload(
+            Bucket=MINIO_BUCKET,
+            Key=object_key,
+            UploadId=multipart["UploadId"],
+            MultipartUpload={"Parts": parts},
+        )
+    except BaseException:
+        await storage.client.abort_multipart_upload(Bucket=MINIO_BUCKET, Key=object_key, UploadId=multipart["UploadId"])
+        raise
+    stored_key, deduplicated = await _record_blob(sha256, upload_job_id, expires_at, object_key, size_bytes)
+    return sha256, size_bytes, stored_key, deduplicated
 
 
 @app.post("/uploads")
-async def create_upload_job(file: UploadFile = File(...)) -> dict[str, str]:
+async def create_upload_job(file: UploadFile = File(...)) -> dict[str, str | bool]:
     upload_job_id = str(uuid.uuid4())
     object_key = f"uploads/{upload_job_id}_{file.filename}"
-    payload = await file.read()
-    s3_client.put_object(Bucket=MINIO_BUCKET, Key=object_key, Body=payload, ContentType=file.content_type)
+    # The blob reference expires with the upload record, so an upload nobody deletes still frees it.
+    expires_at = time.time() + UPLOAD_TTL_SECONDS if UPLOAD_TTL_SECONDS else None
+    sha256, size_bytes, object_key, deduplicated = await _store_upload(file, object_key, upload_job_id, expires_at)
+
+    try:
+        await set_job_async(
+            redis_client,
+            upload_job_id,
+            {
+                "id": upload_job_id,
+                "type": "upload",
+                "status": "uploaded",
+                "progress": 100,
+                "source_object": object_key,
+                "sha256": sha256,
+                "size_bytes": size_bytes,
+                "deduplicated": deduplicated,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+            },
+            ttl_seconds=max(1, math.ceil(expires_at - time.time())) if expires_at is not None else None,
+        )
+    except BaseException:
+        await _release_blob(sha256, upload_job_id)
+        raise
+    return {"job_id": upload_job_id, "sha256": sha256, "deduplicated": deduplicated}
+
+
+@app.delete("/uploads/{upload_job_id}", status_code=204, response_class=Response)
+async def delete_upload_job(upload_job_id: str) -> Response:
+    upload_job = await get_job_async(redis_client, upload_job_id)
+    if not upload_job or upload_job.get("type") != "upload":
+        raise HTTPException(status_code=404, detail="upload job not found")
 
-    set_job(
+    if not await delete_job_async(redis_client, upload_job_id):
+        # A concurrent delete already released this reference.
+        return Response(status_code=204)
+    if _upload_blob_id(upload_job):
+        # Video jobs still reading the object hold their own references, so it may outlive this upload.
+        await _release_blob(_upload_blob_id(upload_job), upload_job_id)
+    elif upload_job.get("source_object"):
+        await storage.client.delete_object(Bucket=MINIO_BUCKET, Key=upload_job["source_object"])
+    return Response(status_code=204)
+
+
+@app.post("/uploads/presign", response_model=UploadPresignResponse)
+async def presign_upload(request: UploadPresignRequest) -> UploadPresignResponse:
+    if request.size_bytes > UPLOAD_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"file exceeds {UPLOAD_MAX_BYTES} bytes")
+
+    upload_job_id = str(uuid.uuid4())
+    object_key = f"uploads/{upload_job_id}_{request.filename}"
+    response = UploadPresignResponse(job_id=upload_job_id, object_key=object_key, expires_in=PRESIGN_EXPIRES_SECONDS)
+    if request.size_bytes <= PRESIGN_MULTIPART_THRESHOLD_BYTES:
+        response.url = await public_storage.client.generate_presigned_url(
+            "put_object",
+            Params={"Bucket": MINIO_BUCKET, "Key": object_key, "ContentType": request.content_type},
+            ExpiresIn=PRESIGN_EXPIRES_SECONDS,
+        )
+    else:
+        multipart = await storage.client.create_multipart_upload(
+            Bucket=MINIO_BUCKET,
+            Key=object_key,
+            ContentType=request.content_type,
+        )
+        response.upload_id = multipart["UploadId"]
+        response.part_size_bytes = UPLOAD_PART_SIZE_BYTES
+        for part_number in range(1, math.ceil(request.size_bytes / UPLOAD_PART_SIZE_BYTES) + 1):
+            url = await public_storage.client.generate_presigned_url(
+                "upload_part",
+                Params={
+                    "Bucket": MINIO_BUCKET,
+                    "Key": object_key,
+                    "UploadId": multipart["UploadId"],
+                    "PartNumber": part_number,
+                },
+                ExpiresIn=PRESIGN_EXPIRES_SECONDS,
+            )
+            response.parts.append(PresignedPart(part_number=part_number, url=url))
+
+    await set_job_async(
         redis_client,
         upload_job_id,
         {
             "id": upload_job_id,
             "type": "upload",
-            "status": "uploaded",
-            "progress": 100,
+            "status": "pending",
+            "progress": 0,
             "source_object": object_key,
+            "multipart_upload_id": response.upload_id or "",
             "created_at": datetime.now(timezone.utc).isoformat(),
         },
+        ttl_seconds=UPLOAD_TTL_SECONDS,
     )
-    return {"job_id": upload_job_id}
+    return response
+
+
+@app.post("/uploads/{upload_job_id}/complete", response_model=UploadStatusResponse)
+async def complete_upload(upload_job_id: str, request: UploadCompleteRequest | None = None) -> UploadStatusResponse:
+    upload_job = await get_job_async(redis_client, upload_job_id)
+    if not upload_job or upload_job.get("type") != "upload":
+        raise HTTPException(status_code=404, detail="upload job not found")
+    if upload_job.get("status") == "uploaded":
+        size_bytes = int(upload_job.get("size_bytes") or 0)
+        return UploadStatusResponse(job_id=upload_job_id, status="uploaded", size_bytes=size_bytes)
+
+    object_key = upload_job["source_object"]
+    if upload_job.get("multipart_upload_id"):
+        if request is None or not request.parts:
+            raise HTTPException(status_code=400, detail="parts are required to complete a multipart upload")
+        try:
+            await storage.client.complete_multipart_upload(
+                Bucket=MINIO_BUCKET,
+                Key=object_key,
+                UploadId=upload_job["multipart_upload_id"],
+                MultipartUpload={
+                    "Parts": [
+                        {"ETag": part.etag, "PartNumber": part.part_number}
+                        for part in sorted(request.parts, key=lambda part: part.part_number)
+                    ]
+                },
+            )
+        except ClientError as exc:
+            raise HTTPException(status_code=409, detail=f"multipart upload could not be completed: {exc}") from exc
+
+    try:
+        head = await storage.client.head_object(Bucket=MINIO_BUCKET, Key=object_key)
+    except ClientError as exc:
+        raise HTTPException(status_code=409, detail="object has not been uploaded yet") from exc
+    if head["ContentLength"] > UPLOAD_MAX_BYTES:
+        await storage.client.delete_object(Bucket=MINIO_BUCKET, Key=object_key)
+        raise HTTPException(status_code=413, detail=f"file exceeds {UPLOAD_MAX_BYTES} bytes")
+
+    # Counted like a hashed upload from here on, so video jobs can pin the object against DELETE and expiry.
+    blob_id = object_blob_id(object_key)
+    expires_at = time.time() + UPLOAD_TTL_SECONDS if UPLOAD_TTL_SECONDS else None
+    await _claim_blob(blob_id, upload_job_id, expires_at, object_key, head["ContentLength"])
+    try:
+        await set_job_async(
+            redis_client,
+            upload_job_id,
+            {"status": "uploaded", "progress": 100, "size_bytes": head["ContentLength"], "blob_id": blob_id},
+            ttl_seconds=UPLOAD_TTL_SECONDS,
+        )
+    except BaseException:
+        await _release_blob(blob_id, upload_job_id)
+        raise
+    return UploadStatusResponse(job_id=upload_job_id, status="uploaded", size_bytes=head["ContentLength"])
+
+
+def _can_attach_to(job: dict[str, str] | None) -> bool:
+    if not job:
+        return False
+    if job.get("status") in (JobStatus.QUEUED, JobStatus.RUNNING):
+        return True
+    if job.get("status") != JobStatus.SUCCEEDED or not job.get("result_object") or not job.get("updated_at"):
+        return False
+    age = datetime.now(timezone.utc) - datetime.fromisoformat(job["updated_at"])
+    return age.total_seconds() <= JOB_DEDUP_RETENTION_SECONDS
 
 
 @app.post("/jobs", response_model=JobCreateResponse)
-def create_video_job(request: JobCreateRequest) -> JobCreateResponse:
-    source_job = get_job(redis_client, request.upload_job_id)
+async def create_video_job(
+    request: JobCreateRequest,
+    tenant_id: str = Header(default="default", alias="X-Tenant-ID"),
+) -> JobCreateResponse:
+    source_job = await get_job_async(redis_client, request.upload_job_id)
     if not source_job or source_job.get("type") != "upload":
         raise HTTPException(status_code=404, detail="upload_job_id not found")
+    if source_job.get("status") != "uploaded":
+        raise HTTPException(status_code=409, detail="upload is not complete")
+
+    estimated_cost = estimate_render_cost(request.duration_seconds)
+    # A distributed job only plans and fans out; its segments are routed by their own cost on the worker.
+    queue_name = SHORT_QUEUE if request.render_mode == "distributed" else queue_for_cost(estimated_cost)
 
     job_id = str(uuid.uuid4())
-    set_job(
+    source_sha256 = source_job.get("sha256", "")
+    source_blob_id = _upload_blob_id(source_job)
+    # Outlives the longest wait the global cap allows plus every attempt of the render, so the source
+    # cannot be deleted under a job that may still download it.
+    max_wait_seconds = ADMISSION_GLOBAL_MAX_BACKLOG_SECONDS or JOB_FINISHED_TTL_SECONDS
+    pin_expires_at = time.time() + max_wait_seconds + JOB_MAX_TIMEOUT_SECONDS * 5
+    if source_blob_id and not await _claim_blob(source_blob_id, f"job:{job_id}", pin_expires_at):
+        # The upload was deleted or expired after it was read.
+        raise HTTPException(status_code=404, detail="upload_job_id not found")
+
+    await set_job_async(
         redis_client,
         job_id,
         {
@@ -88,35 +468,156 @@ def create_video_job(request: JobCreateRequest) -> JobCreateResponse:
             "progress": 0,
             "source_upload_job_id": request.upload_job_id,
             "source_object": source_job["source_object"],
+            "source_sha256": source_sha256,
             "duration_seconds": request.duration_seconds,
             "style": request.style,
             "bgm_enabled": request.bgm_enabled,
             "edit_instruction": request.edit_instruction,
+            "render_concurrency": request.render_concurrency or "",
+            "render_mode": request.render_mode,
+            "render_engine": request.render_engine,
+            "render_profile": request.render_profile,
+            "frame_engine": request.frame_engine,
+            "output_format": request.output_format,
+            "queue": queue_name,
+            "tenant_id": tenant_id,
+            "estimated_cost": estimated_cost,
             "created_at": datetime.now(timezone.utc).isoformat(),
         },
     )
 
-    queue.enqueue(
-        "worker.app.tasks.generate_video",
+    if JOB_DEDUP_ENABLED:
+        # render_mode and render_concurrency only change how the same video is produced, so they are left out.
+        fingerprint = job_fingerprint(
+            source=source_job.get("sha256") or source_job["source_object"],
+            duration_seconds=request.duration_seconds,
+            style=request.style,
+            bgm_enabled=request.bgm_enabled,
+            edit_instruction=request.edit_instruction.strip(),
+            render_engine=request.render_engine,
+            render_profile=request.render_profile,
+            frame_engine=request.frame_engine,
+            output_format=request.output_format,
+        )
+        # Long enough to cover every retry of an in-flight render plus the result retention window.
+        fingerprint_ttl = JOB_MAX_TIMEOUT_SECONDS * 4 + JOB_DEDUP_RETENTION_SECONDS
+        while True:
+            existing_id = await get_fingerprint_job(redis_client, fingerprint)
+            if existing_id:
+                existing_job = await get_job_async(redis_client, existing_id)
+                if _can_attach_to(existing_job):
+                    await delete_job_async(redis_client, job_id)
+                    if source_blob_id:
+                        await _release_blob(source_blob_id, f"job:{job_id}")
+                    JOBS_COALESCED.inc()
+                    return JobCreateResponse(job_id=existing_id, status=existing_job["status"], coalesced=True)
+            # The new record already exists, so a racing submission that reads this fingerprint attaches to it.
+            if await swap_fingerprint_job(redis_client, fingerprint, existing_id, job_id, fingerprint_ttl):
+                break
+
+    render_seconds = await estimate_render_seconds_async(
+        redis_client, request.duration_seconds, estimate_segment_count(request.duration_seconds)
+    )
+    workers = max(1, await count_workers_async(redis_client))
+    now = time.time()
+    # Outlives the longest wait the global cap allows plus every retry, so only a job that never
+    # reports back loses its reservation this way.
+    admitted, backlog_seconds, excess_seconds = await reserve_backlog_async(
+        redis_client,
         job_id,
-        source_job["source_object"],
-        request.duration_seconds,
-        request.style,
-        request.bgm_enabled,
-        request.edit_instruction,
-        job_timeout=JOB_MAX_TIMEOUT_SECONDS,
-        retry=Retry(max=3, interval=[2, 4, 8]),
+        tenant_id,
+        render_seconds,
+        ADMISSION_GLOBAL_MAX_BACKLOG_SECONDS,
+        ADMISSION_TENANT_MAX_BACKLOG_SECONDS,
+        now=now,
+        expires_at=now + max_wait_seconds + render_seconds + JOB_MAX_TIMEOUT_SECONDS * 4,
+    )
+    if not admitted:
+        # Mark rather than delete: identical submissions may already have attached to this record.
+        await update_job_async(
+            redis_client,
+            job_id,
+            status=JobStatus.FAILED,
+            error_code="BACKLOG_FULL",
+            error_message="render backlog is full",
+            retryable=True,
+        )
+        if source_blob_id:
+            await _release_blob(source_blob_id, f"job:{job_id}")
+        JOBS_REJECTED.labels("BACKLOG_FULL").inc()
+        retry_after = max(1, math.ceil(excess_seconds / workers))
+        raise HTTPException(
+            status_code=429,
+            detail="render backlog is full",
+            headers={"Retry-After": str(retry_after)},
+        )
+    await set_job_async(
+        redis_client,
+        job_id,
+        {
+            "estimated_render_seconds": round(render_seconds, 1),
+            "estimated_start_at": datetime.fromtimestamp(now + backlog_seconds / workers, timezone.utc).isoformat(),
+        },
     )
 
+    try:
+        await run_in_threadpool(
+            queues[queue_name].enqueue,
+            "worker.app.tasks.generate_video",
+            job_id,
+            source_job["source_object"],
+            request.duration_seconds,
+            request.style,
+            request.bgm_enabled,
+            request.edit_instruction,
+            render_concurrency=request.render_concurrency,
+            render_mode=request.render_mode,
+            render_engine=request.render_engine,
+            render_profile=request.render_profile,
+            frame_engine=request.frame_engine,
+            output_format=request.output_format,
+            source_sha256=source_job.get("sha256", ""),
+            job_timeout=JOB_MAX_TIMEOUT_SECONDS,
+            retry=Retry(max=3, interval=[2, 4, 8]),
+        )
+    except Exception:
+        await release_backlog_async(redis_client, job_id)
+        # Never leave a queued record behind that identical submissions would attach to.
+        await update_job_async(
+            redis_client, job_id, status=JobStatus.FAILED, error_code="ENQUEUE_FAILED", retryable=True
+        )
+        if source_blob_id:
+            await _release_blob(source_blob_id, f"job:{job_id}")
+        JOBS_REJECTED.labels("ENQUEUE_FAILED").inc()
+        raise
+
+    JOBS_SUBMITTED.labels(queue_name).inc()
     return JobCreateResponse(job_id=job_id, status=JobStatus.QUEUED)
 
 
-@app.get("/jobs/{job_id}", response_model=JobStatusResponse)
-def get_job_status(job_id: str) -> JobStatusResponse:
-    job = get_job(redis_client, job_id)
-    if not job:
-        raise HTTPException(status_code=404, detail="job not found")
+def _estimate_eta_seconds(status: JobStatus, job: dict[str, str]) -> float | None:
+    render_seconds = float(job.get("estimated_render_seconds") or 0)
+    if status not in (JobStatus.QUEUED, JobStatus.RUNNING) or render_seconds <= 0:
+        return None
+    now = datetime.now(timezone.utc)
+    if status == JobStatus.QUEUED:
+        wait = 0.0
+        if job.get("estimated_start_at"):
+            wait = max(0.0, (datetime.fromisoformat(job["estimated_start_at"]) - now).total_seconds())
+        return round(wait + render_seconds, 1)
+
+    progress = int(job.get("progress", 0))
+    if not job.get("started_at"):
+        return round(render_seconds * (100 - progress) / 100, 1)
+    elapsed = (now - datetime.fromisoformat(job["started_at"])).total_seconds()
+    remaining = render_seconds - elapsed
+    if remaining <= 0 and progress > 0:
+        # Running past the model's estimate: extrapolate from progress so far instead.
+        remaining = elapsed * (100 - progress) / progress
+    return round(max(0.0, remaining), 1)
+
 
+def _build_status_response(job_id: str, job: dict[str, str]) -> JobStatusResponse:
     retryable = job.get("retryable")
     status_raw = job.get("status", JobStatus.FAILED)
     status = JobStatus(status_raw) if status_raw in JobStatus._value2member_map_ else JobStatus.FAILED
@@ -127,20 +628,164 @@ def get_job_status(job_id: str) -> JobStatusResponse:
         error_code=job.get("error_code"),
         error_message=job.get("error_message"),
         retryable=(retryable.lower() == "true") if retryable is not None else None,
+        frames_done=int(job["frames_done"]) if job.get("frames_done") else None,
+        frames_total=int(job["frames_total"]) if job.get("frames_total") else None,
+        encode_fps=float(job["encode_fps"]) if job.get("encode_fps") else None,
+        speed=float(job["speed"]) if job.get("speed") else None,
+        eta_seconds=_estimate_eta_seconds(status, job),
+    )
+
+
+@app.get("/jobs", response_model=JobStatusListResponse)
+async def list_job_statuses(ids: str = Query(..., description="Comma-separated job IDs")) -> JobStatusListResponse:
+    job_ids = list(dict.fromkeys(job_id.strip() for job_id in ids.split(",") if job_id.strip()))
+    if len(job_ids) > JOB_STATUS_BULK_LIMIT:
+        raise HTTPException(status_code=400, detail=f"at most {JOB_STATUS_BULK_LIMIT} ids per request")
+
+    jobs: list[JobStatusResponse] = []
+    missing: list[str] = []
+    for job_id, job in zip(job_ids, await get_jobs_async(redis_client, job_ids)):
+        if job:
+            jobs.append(_build_status_response(job_id, job))
+        else:
+            missing.append(job_id)
+    return JobStatusListResponse(jobs=jobs, missing=missing)
+
+
+@app.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job_status(job_id: str) -> JobStatusResponse:
+    job = await get_job_async(redis_client, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="job not found")
+    return _build_status_response(job_id, job)
+
+
+@app.get("/jobs/{job_id}/timings", response_model=JobTimingsResponse)
+async def get_job_timings(job_id: str) -> JobTimingsResponse:
+    job = await get_job_async(redis_client, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="job not found")
+    stages = await get_job_timings_async(redis_client, job_id)
+
+    queue_wait_sec = None
+    if job.get("created_at") and job.get("started_at"):
+        queue_wait_sec = round(
+            (datetime.fromisoformat(job["started_at"]) - datetime.fromisoformat(job["created_at"])).total_seconds(), 3
+        )
+    return JobTimingsResponse(
+        job_id=job_id,
+        status=_build_status_response(job_id, job).status,
+        queue_wait_sec=queue_wait_sec,
+        wall_sec=round(sum(float(stage["wall_sec"]) for stage in stages), 3),
+        child_cpu_sec=round(sum(float(stage["child_cpu_sec"]) for stage in stages), 3),
+        stages=stages,
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics() -> Response:
+    pipe = redis_client.pipeline(transaction=False)
+    for queue in queues.values():
+        pipe.llen(queue.key)
+        pipe.zcard(queue.started_job_registry.key)
+        pipe.zcard(queue.failed_job_registry.key)
+    counts = await pipe.execute()
+    for index, name in enumerate(queues):
+        depth, running, failed = counts[index * 3 : index * 3 + 3]
+        QUEUE_DEPTH.labels(name).set(depth)
+        QUEUE_RUNNING.labels(name).set(running)
+        QUEUE_FAILED.labels(name).set(failed)
+    WORKERS.set(await count_workers_async(redis_client))
+    BACKLOG_SECONDS.set(await get_backlog_seconds_async(redis_client))
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+def _format_sse(event: str, data: str) -> str:
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str) -> StreamingResponse:
+    if not await get_job_async(redis_client, job_id):
+        raise HTTPException(status_code=404, detail="job not found")
+
+    async def event_stream() -> AsyncIterator[str]:
+        # Subscribe before reading the snapshot so no update can slip in between the two.
+        async with job_events.subscribe(job_id) as events:
+            job = await get_job_async(redis_client, job_id)
+            if not job:
+                return
+            yield _format_sse("snapshot", _build_status_response(job_id, job).model_dump_json())
+            if job.get("status") in FINISHED_STATUSES:
+                return
+
+            while True:
+                try:
+                    update = await asyncio.wait_for(events.get(), timeout=JOB_EVENTS_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield _format_sse("update", update)
+                if json.loads(update).get("status") in FINISHED_STATUSES:
+                    return
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _presign_result_object(object_key: str) -> str:
+    return await public_storage.client.generate_presigned_url(
+        "get_object",
+        Params={"Bucket": MINIO_BUCKET, "Key": object_key},
+        ExpiresIn=RESULT_URL_EXPIRES_SECONDS,
+    )
+
+
+@app.get("/jobs/{job_id}/playlist.m3u8", include_in_schema=False)
+async def get_job_playlist(job_id: str) -> Response:
+    job = await get_job_async(redis_client, job_id)
+    if not job or job.get("output_format") != "hls":
+        raise HTTPException(status_code=404, detail="playlist not found")
+    segments = ready_segments(await get_hls_segments_async(redis_client, job_id))
+    if not segments:
+        raise HTTPException(status_code=409, detail="no segment is ready yet")
+
+    # Signed per request, so a player polling the playlist always gets URLs that still work.
+    segment_urls = [
+        (await _presign_result_object(segment["object"]), float(segment["duration_sec"])) for segment in segments
+    ]
+    return Response(
+        content=build_event_playlist(segment_urls, ended=job.get("status") == JobStatus.SUCCEEDED),
+        media_type=PLAYLIST_CONTENT_TYPE,
+        headers={"Cache-Control": "no-cache"},
     )
 
 
 @app.get("/jobs/{job_id}/result", response_model=JobResultResponse)
-def get_job_result(job_id: str) -> JobResultResponse:
-    job = get_job(redis_client, job_id)
+async def get_job_result(job_id: str, request: Request) -> JobResultResponse:
+    job = await get_job_async(redis_client, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="job not found")
+
+    playlist_url = None
+    if job.get("output_format") == "hls" and ready_segments(await get_hls_segments_async(redis_client, job_id)):
+        playlist_url = str(request.url_for("get_job_playlist", job_id=job_id))
     if job.get("status") != JobStatus.SUCCEEDED:
+        if job.get("status") == JobStatus.RUNNING and playlist_url:
+            return JobResultResponse(job_id=job_id, status=JobStatus.RUNNING, playlist_url=playlist_url)
         raise HTTPException(status_code=409, detail="job is not succeeded")
 
     result_object = job.get("result_object")
     if not result_object:
         raise HTTPException(status_code=500, detail="result not found")
 
-    result_url = f"{PUBLIC_BASE_URL}/{MINIO_BUCKET}/{result_object}"
-    return JobResultResponse(job_id=job_id, status=JobStatus.SUCCEEDED, result_url=result_url)
+    return JobResultResponse(
+        job_id=job_id,
+        status=JobStatus.SUCCEEDED,
+        result_url=await _presign_result_object(result_object),
+        expires_in=RESULT_URL_EXPIRES_SECONDS,
+        playlist_url=playlist_url,
+    )
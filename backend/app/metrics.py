@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+from prometheus_client import Counter, Gauge
+
+# Queue gauges are refreshed from Redis on every scrape, so they stay right with several backend replicas.
+QUEUE_DEPTH = Gauge("video_queue_depth", "Jobs waiting in each RQ queue.", ["queue"])
+QUEUE_RUNNING = Gauge("video_queue_running", "Jobs a worker has started from each RQ queue.", ["queue"])
+QUEUE_FAILED = Gauge("video_queue_failed", "Jobs in each queue's RQ failed registry.", ["queue"])
+WORKERS = Gauge("video_workers", "Workers registered with RQ.")
+BACKLOG_SECONDS = Gauge("video_backlog_seconds", "Estimated render seconds admitted and not yet finished.")
+
+JOBS_SUBMITTED = Counter("video_jobs_submitted_total", "Video jobs enqueued, by queue tier.", ["queue"])
+JOBS_COALESCED = Counter("video_jobs_coalesced_total", "Submissions attached to an identical existing job.")
+JOBS_REJECTED = Counter("video_jobs_rejected_total", "Submissions refused, by error code.", ["error_code"])
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import math
+from typing import Any
+
+from common.scheduling import SEGMENT_MAX_SECONDS
+
+# An EVENT playlist may only grow at its end, so only the run of segments from index 0 without gaps is
+# listed. The target duration is fixed up front because players reject one that changes mid-stream.
+PLAYLIST_CONTENT_TYPE = "application/vnd.apple.mpegurl"
+
+
+def ready_segments(segments: dict[int, dict[str, Any]]) -> list[dict[str, Any]]:
+    ready = []
+    while len(ready) in segments:
+        ready.append(segments[len(ready)])
+    return ready
+
+
+def build_event_playlist(segment_urls: list[tuple[str, float]], ended: bool) -> str:
+    target_duration = max([SEGMENT_MAX_SECONDS, *(math.ceil(duration) for _, duration in segment_urls)])
+    lines = [
+        "#EXTM3U",
+        "#EXT-X-VERSION:3",
+        "#EXT-X-PLAYLIST-TYPE:EVENT",
+        f"#EXT-X-TARGETDURATION:{target_duration}",
+        "#EXT-X-MEDIA-SEQUENCE:0",
+    ]
+    for url, duration in segment_urls:
+        lines.extend([f"#EXTINF:{duration:.3f},", url])
+    if ended:
+        lines.append("#EXT-X-ENDLIST")
+    return "\n".join(lines) + "\n"
@@ -1,8 +1,46 @@
-from pydantic import BaseModel, Field
+from typing import Literal
+
+from pydantic import BaseModel, Field, model_validator
 
 from backend.models import JobStatus
 
 
+class UploadPresignRequest(BaseModel):
+    filename: str = Field(..., min_length=1, max_length=255)
+    content_type: str = Field(default="application/octet-stream", max_length=128)
+    size_bytes: int = Field(..., ge=1, description="Exact size of the file the client will PUT")
+
+
+class PresignedPart(BaseModel):
+    part_number: int
+    url: str
+
+
+class UploadPresignResponse(BaseModel):
+    job_id: str
+    object_key: str
+    expires_in: int
+    url: str | None = Field(default=None, description="Single PUT URL; unset for multipart uploads")
+    upload_id: str | None = None
+    part_size_bytes: int | None = None
+    parts: list[PresignedPart] = Field(default_factory=list)
+
+
+class CompletedPart(BaseModel):
+    part_number: int = Field(..., ge=1)
+    etag: str
+
+
+class UploadCompleteRequest(BaseModel):
+    parts: list[CompletedPart] = Field(default_factory=list, description="ETags from each part PUT (multipart only)")
+
+
+class UploadStatusResponse(BaseModel):
+    job_id: str
+    status: str
+    size_bytes: int | None = None
+
+
 class JobCreateRequest(BaseModel):
     upload_job_id: str = Field(..., description="ID returned by POST /uploads")
     duration_seconds: int = Field(..., ge=1, le=600)
@@ -13,11 +51,51 @@ class JobCreateRequest(BaseModel):
         max_length=500,
         description="Natural-language instruction used to auto-select effects/transitions/telops/music",
     )
+    render_concurrency: int | None = Field(
+        default=None,
+        ge=1,
+        le=16,
+        description="Number of segments rendered in parallel (default: worker SEGMENT_RENDER_CONCURRENCY)",
+    )
+    render_mode: Literal["local", "distributed"] = Field(
+        default="local",
+        description="'distributed' renders each segment as its own queued job on any available worker",
+    )
+    render_engine: Literal["segments", "single_pass"] = Field(
+        default="segments",
+        description="'single_pass' encodes the whole plan in one ffmpeg filter graph without intermediate files",
+    )
+    render_profile: Literal["draft", "standard", "high"] = Field(
+        default="standard",
+        description="Encoder speed/quality trade-off: 'draft' for quick previews, 'high' for final deliverables",
+    )
+    frame_engine: Literal["zoompan", "numpy"] = Field(
+        default="zoompan",
+        description="'numpy' synthesizes the zoom/pan frames in the worker and pipes them to the encoder",
+    )
+    output_format: Literal["mp4", "hls"] = Field(
+        default="mp4",
+        description="'hls' also publishes each segment as it is encoded, playable from GET /jobs/{job_id}/result",
+    )
+
+    @model_validator(mode="after")
+    def check_render_options(self) -> "JobCreateRequest":
+        if self.render_mode == "distributed" and self.render_engine != "segments":
+            raise ValueError("render_mode 'distributed' requires render_engine 'segments'")
+        if self.frame_engine == "numpy" and self.render_engine != "segments":
+            raise ValueError("frame_engine 'numpy' requires render_engine 'segments'")
+        if self.output_format == "hls" and (self.render_engine != "segments" or self.render_mode != "local"):
+            raise ValueError("output_format 'hls' requires render_engine 'segments' and render_mode 'local'")
+        return self
 
 
 class JobCreateResponse(BaseModel):
     job_id: str
     status: JobStatus
+    coalesced: bool = Field(
+        default=False,
+        description="True when an identical job was already queued, running or recently succeeded",
+    )
 
 
 class JobStatusResponse(BaseModel):
@@ -27,9 +105,47 @@ class JobStatusResponse(BaseModel):
     error_code: str | None = None
     error_message: str | None = None
     retryable: bool | None = None
+    frames_done: int | None = None
+    frames_total: int | None = None
+    encode_fps: float | None = None
+    speed: float | None = Field(default=None, description="Encode speed as a multiple of real time")
+    eta_seconds: float | None = Field(
+        default=None,
+        description="Estimated seconds until the job finishes, from measured render times and the backlog ahead",
+    )
+
+
+class JobStatusListResponse(BaseModel):
+    jobs: list[JobStatusResponse]
+    missing: list[str] = Field(default_factory=list, description="Requested IDs with no job record")
 
 
 class JobResultResponse(BaseModel):
     job_id: str
     status: JobStatus
-    result_url: str
+    result_url: str | None = Field(default=None, description="Finished MP4; null until the job has succeeded")
+    expires_in: int | None = Field(default=None, description="Seconds until result_url stops working")
+    playlist_url: str | None = Field(
+        default=None,
+        description="HLS event playlist of an 'hls' job, available once its first segment is encoded",
+    )
+
+
+class JobStageTiming(BaseModel):
+    stage: str
+    segment_index: int | None = None
+    attempt: int | None = None
+    fallback: bool | None = None
+    started_at: str
+    wall_sec: float
+    child_cpu_sec: float = Field(..., description="CPU time of the ffmpeg processes the stage ran")
+    outcome: Literal["ok", "error", "timeout"]
+
+
+class JobTimingsResponse(BaseModel):
+    job_id: str
+    status: JobStatus
+    queue_wait_sec: float | None = Field(default=None, description="Seconds from submission to the first worker start")
+    wall_sec: float = Field(..., description="Sum of stage wall times; concurrent segment renders overlap")
+    child_cpu_sec: float
+    stages: list[JobStageTiming] = Field(default_factory=list, description="In completion order, across retries")
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from contextlib import AsyncExitStack
+from typing import Any
+
+from aiobotocore.config import AioConfig
+from aiobotocore.session import get_session
+
+
+class ObjectStorage:
+    # aiobotocore clients are async context managers, so the client lives from app startup to shutdown.
+    def __init__(self, endpoint_url: str, access_key: str, secret_key: str, max_connections: int) -> None:
+        self._client_kwargs = {
+            "endpoint_url": endpoint_url,
+            "aws_access_key_id": access_key,
+            "aws_secret_access_key": secret_key,
+            "config": AioConfig(signature_version="s3v4", max_pool_connections=max_connections),
+            "region_name": "us-east-1",
+        }
+        self._exit_stack = AsyncExitStack()
+        self._client: Any = None
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            raise RuntimeError("object storage client is not started")
+        return self._client
+
+    async def start(self) -> None:
+        self._client = await self._exit_stack.enter_async_context(
+            get_session().create_client("s3", **self._client_kwargs)
+        )
+
+    async def stop(self) -> None:
+        await self._exit_stack.aclose()
+        self._client = None
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import itertools
+import os
+import random
+import statistics
+import sys
+import time
+
+import httpx
+
+# Drives POST /uploads, POST /jobs and GET /jobs/{id} concurrently against a running backend.
+# Start the stand-ins first: docker compose -f infra/docker-compose.yml up redis minio backend
+
+
+def summarize(latencies: list[float], elapsed: float, errors: int) -> dict[str, float | int]:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "rps": round(len(ordered) / elapsed, 1) if elapsed > 0 else 0.0,
+        "p50_ms": round(statistics.median(ordered) * 1000, 2) if ordered else 0.0,
+        "p99_ms": round(ordered[max(0, int(len(ordered) * 0.99) - 1)] * 1000, 2) if ordered else 0.0,
+    }
+
+
+async def timed(client: httpx.AsyncClient, method: str, url: str, **kwargs) -> tuple[float, httpx.Response | None]:
+    started = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+    except httpx.HTTPError:
+        return time.perf_counter() - started, None
+    return time.perf_counter() - started, response
+
+
+async def run(args: argparse.Namespace) -> dict[str, dict[str, float | int]]:
+    # Bytes and job inputs are unique per request unless --duplicate-ratio says otherwise; repeats hit the
+    # upload dedup and job coalescing paths, which skip storage writes and enqueues, so they are reported apart.
+    base_payload = os.urandom(args.upload_bytes)
+    duplicate = random.Random(0)
+    latencies: dict[str, list[float]] = {
+        "uploads": [],
+        "uploads_deduplicated": [],
+        "jobs": [],
+        "jobs_coalesced": [],
+        "status": [],
+    }
+    errors = {name: 0 for name in latencies}
+    upload_ids: list[str] = []
+    job_ids: list[str] = []
+    sequence = itertools.count(1)
+    deadline = time.perf_counter() + args.seconds
+
+    def record(name: str, shortcut: str, flag: str, elapsed: float, response: httpx.Response | None) -> dict | None:
+        if response is None or response.status_code >= 400:
+            latencies[name].append(elapsed)
+            errors[name] += 1
+            return None
+        body = response.json()
+        latencies[shortcut if body.get(flag) else name].append(elapsed)
+        return body
+
+    async def user(client: httpx.AsyncClient, index: int) -> None:
+        while time.perf_counter() < deadline:
+            kind = ("uploads", "jobs", "status", "status")[index % 4] if upload_ids else "uploads"
+            index += 1
+            repeat = duplicate.random() < args.duplicate_ratio
+            request_number = 0 if repeat else next(sequence)
+            if kind == "uploads":
+                payload = request_number.to_bytes(8, "big") + base_payload[8:]
+                files = {"file": ("load.jpg", payload, "image/jpeg")}
+                response = await timed(client, "POST", "/uploads", files=files)
+                body = record(kind, "uploads_deduplicated", "deduplicated", *response)
+                if body:
+                    upload_ids.append(body["job_id"])
+            elif kind == "jobs":
+                request = {
+                    "upload_job_id": upload_ids[0 if repeat else index % len(upload_ids)],
+                    "duration_seconds": 10,
+                    "style": "load",
+                    "edit_instruction": f"load {request_number}",
+                }
+                body = record(kind, "jobs_coalesced", "coalesced", *await timed(client, "POST", "/jobs", json=request))
+                if body:
+                    job_ids.append(body["job_id"])
+            elif job_ids:
+                response = await timed(client, "GET", f"/jobs/{job_ids[index % len(job_ids)]}")
+                record(kind, kind, "", *response)
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30.0) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(user(client, index) for index in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {name: summarize(values, elapsed, errors[name]) for name, values in latencies.items()}
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Latency and throughput of the backend endpoints.")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--upload-bytes", type=int, default=2 * 1024**2)
+    parser.add_argument(
+        "--duplicate-ratio",
+        type=float,
+        default=0.0,
+        help="Share of uploads and jobs that repeat earlier bytes/inputs (0 measures only fresh writes and enqueues)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv or sys.argv[1:])
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from worker.feature_index import (  # noqa: E402
+    FeatureIndex,
+    build_feature_catalog,
+    instruction_keys,
+    normalize_instruction,
+)
+
+INSTRUCTIONS = (
+    "telop bgm",
+    "transition, scene_cut 0012",
+    "テロップとBGMを追加して色を明るく",
+    "カメラをゆっくりズームしてタイトルを表示",
+    "color",
+)
+# Instructions without Japanese aliases must select exactly what the linear scan did.
+EQUIVALENCE_CORPUS = (
+    "",
+    "   ",
+    "telop bgm",
+    "TELOP  BGM",
+    "bgm bgm",
+    "transition, scene_cut 0012",
+    "color、title",
+    "fade-in",
+    "zoom.in",
+    "camera-pan",
+    "in",
+    "_",
+    "0",
+    "effect_0001",
+    "overlay_0100 timing",
+    "scene_cut_0999,cut",
+    "ｔｅｌｏｐ",
+    "明るくして",
+    "xyz",
+)
+
+
+def linear_scan(instruction: str, catalog: list[str], limit: int = 16) -> list[str]:
+    # The selection the pipeline used before the index: every key against every catalog entry.
+    normalized = normalize_instruction(instruction)
+    if not normalized:
+        return catalog[:limit]
+    keys = instruction_keys(normalized)
+    weighted = [(sum(len(key) for key in keys if key in feature), feature) for feature in catalog]
+    weighted = sorted((row for row in weighted if row[0] > 0), key=lambda row: (-row[0], row[1]))
+    selected = [feature for _, feature in weighted[:limit]]
+    return selected + catalog[: limit - len(selected)]
+
+
+def time_per_call(func, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for instruction in INSTRUCTIONS:
+            func(instruction)
+    return (time.perf_counter() - started) / (repeat * len(INSTRUCTIONS)) * 1_000_000
+
+
+def mismatches(index: FeatureIndex, catalog: list[str]) -> list[str]:
+    return [text for text in EQUIVALENCE_CORPUS if index.select(text) != linear_scan(text, catalog)]
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Feature selection cost versus catalog size.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2_000, 10_000, 50_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv or sys.argv[1:])
+
+    results = []
+    failed = False
+    for size in args.sizes:
+        catalog = build_feature_catalog(size)
+        started = time.perf_counter()
+        index = FeatureIndex(catalog, cache_size=0)
+        build_ms = (time.perf_counter() - started) * 1000
+        memoized = FeatureIndex(catalog)
+        # Warm timings only start once every instruction is cached; cold ones never hit the cache.
+        time_per_call(memoized.select, 1)
+        mismatched = mismatches(index, catalog)
+        failed = failed or bool(mismatched)
+        results.append(
+            {
+                "catalog_size": size,
+                "index_build_ms": round(build_ms, 1),
+                "linear_scan_us": round(time_per_call(lambda text: linear_scan(text, catalog), args.repeat), 1),
+                "cold_us": round(time_per_call(index.select, args.repeat), 1),
+                "warm_us": round(time_per_call(memoized.select, args.repeat), 1),
+                "mismatched_instructions": mismatched,
+            }
+        )
+
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.render_engines import make_source_image  # noqa: E402
+from worker.pipeline import (  # noqa: E402
+    FRAME_ENGINES,
+    OUTPUT_FPS,
+    _render_segment,
+    _synthesize_segment_frames,
+    prepare_source_image,
+)
+
+# Frames per second of zoompan against NumPy frame synthesis for one segment, end to end through
+# the encoder, plus the synthesis rate alone (no ffmpeg) to show how much headroom the encoder has.
+
+
+def measure_synthesis(prepared_path: Path, duration: int) -> dict[str, object]:
+    plan = {"segment_index": 0, "duration_sec": duration}
+    started = time.perf_counter()
+    frames = sum(1 for _ in _synthesize_segment_frames(prepared_path, plan))
+    elapsed = time.perf_counter() - started
+    return {"engine": "numpy-synthesis-only", "duration_sec": duration, "fps": round(frames / elapsed, 1)}
+
+
+def measure_render(prepared_path: Path, work_dir: Path, engine: str, duration: int) -> dict[str, object]:
+    plan = {"segment_index": 0, "duration_sec": duration, "frame_engine": engine}
+    output_path = work_dir / f"{engine}_{duration}s.mp4"
+    started = time.perf_counter()
+    _render_segment(prepared_path, plan, output_path)
+    elapsed = time.perf_counter() - started
+    result = {
+        "engine": engine,
+        "duration_sec": duration,
+        "wall_sec": round(elapsed, 3),
+        "fps": round(duration * OUTPUT_FPS / elapsed, 1),
+        "output_bytes": output_path.stat().st_size,
+    }
+    output_path.unlink()
+    return result
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare zoompan with NumPy frame synthesis.")
+    parser.add_argument("--durations", type=int, nargs="+", default=[10, 60])
+    parser.add_argument("--engines", nargs="+", choices=FRAME_ENGINES, default=list(FRAME_ENGINES))
+    parser.add_argument("--resolution", default="4000x3000", help="Synthetic source image size (WxH)")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv or sys.argv[1:])
+    width, height = (int(value) for value in args.resolution.split("x"))
+
+    results = []
+    with TemporaryDirectory() as temp_dir:
+        work_dir = Path(temp_dir)
+        source_path = make_source_image(work_dir / "source.png", width, height)
+        prepared_path = prepare_source_image(source_path, work_dir / "source.ppm")
+        for duration in args.durations:
+            results.append(measure_synthesis(prepared_path, duration))
+            for engine in args.engines:
+                results.append(measure_render(prepared_path, work_dir, engine, duration))
+
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import argparse
+import json
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.render_engines import make_source_image  # noqa: E402
+from common.render_profiles import DEFAULT_RENDER_PROFILE, RENDER_PROFILE_NAMES  # noqa: E402
+
+# Runs the worker pipeline and the desktop CLI over a grid of source resolutions and durations.
+# Every case runs in its own interpreter so child CPU time, peak RSS and write counters belong to
+# that case alone. Needs only a local ffmpeg:
+#   python benchmarks/pipeline_suite.py --output results.json
+#   python benchmarks/pipeline_suite.py --baseline results.json   # exits 1 on regressions
+
+TARGETS = ("pipeline", "cli")
+DEFAULT_DURATIONS = [1, 10, 60, 300, 600]
+DEFAULT_RESOLUTIONS = ["1280x720", "1920x1080", "4000x3000"]
+COMPARED_METRICS = ("wall_sec", "ffmpeg_cpu_sec", "peak_rss_mb", "bytes_written")
+# Timings this small are mostly process start-up noise, so they never count as regressions.
+ABSOLUTE_SLACK = {"wall_sec": 0.25, "ffmpeg_cpu_sec": 0.25, "peak_rss_mb": 8.0, "bytes_written": 64 * 1024}
+
+
+def case_key(case: dict[str, Any]) -> str:
+    return f"{case['target']}/{case['profile']}/{case['resolution']}/{case['duration_sec']}s"
+
+
+def _written_bytes() -> int | None:
+    # wchar counts bytes passed to write() by this process and every child it has reaped (ffmpeg).
+    try:
+        for line in Path("/proc/self/io").read_text().splitlines():
+            if line.startswith("wchar:"):
+                return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def run_case(case: dict[str, Any]) -> dict[str, Any]:
+    from image_to_video_app import generate_video
+    from worker.pipeline import generate_video_from_image
+
+    image_path = Path(case["image_path"])
+    output_path = Path(case["work_dir"]) / f"{case['target']}_{case['profile']}_{case['duration_sec']}s.mp4"
+    written_before = _written_bytes()
+    children_before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    started = time.perf_counter()
+    if case["target"] == "pipeline":
+        job = {
+            "duration_sec": case["duration_sec"],
+            "seed": 1,
+            "image_path": str(image_path),
+            "output_path": str(output_path),
+            "render_profile": case["profile"],
+        }
+        result = generate_video_from_image(job)
+        reported_bytes = int(result["render"]["bytes_written"])
+    else:
+        generate_video(image_path, output_path, case["duration_sec"], profile=case["profile"])
+        reported_bytes = output_path.stat().st_size
+    wall_sec = time.perf_counter() - started
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    written_after = _written_bytes()
+    own_peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    output_bytes = output_path.stat().st_size
+    output_path.unlink()
+    return {
+        "wall_sec": round(wall_sec, 3),
+        "ffmpeg_cpu_sec": round(
+            (children.ru_utime - children_before.ru_utime) + (children.ru_stime - children_before.ru_stime), 3
+        ),
+        # ru_maxrss is in KiB on Linux; the larger of this interpreter and its largest ffmpeg child.
+        "peak_rss_mb": round(max(own_peak_kb, children.ru_maxrss) / 1024, 1),
+        "bytes_written": (
+            written_after - written_before
+            if written_before is not None and written_after is not None
+            else reported_bytes
+        ),
+        "output_bytes": output_bytes,
+    }
+
+
+def run_isolated(case: dict[str, Any], repeat: int) -> dict[str, Any]:
+    samples = []
+    for _ in range(repeat):
+        completed = subprocess.run(
+            [sys.executable, __file__, "--case", json.dumps(case)],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        samples.append(json.loads(completed.stdout))
+    # Medians keep one noisy repetition from deciding the result.
+    metrics = {name: statistics.median(sample[name] for sample in samples) for name in samples[0]}
+    return {
+        "target": case["target"],
+        "profile": case["profile"],
+        "resolution": case["resolution"],
+        "duration_sec": case["duration_sec"],
+        "repeat": repeat,
+        **metrics,
+    }
+
+
+def compare(results: list[dict[str, Any]], baseline: list[dict[str, Any]], tolerance: float) -> list[str]:
+    baseline_by_key = {case_key(entry): entry for entry in baseline}
+    regressions = []
+    for entry in results:
+        reference = baseline_by_key.get(case_key(entry))
+        if reference is None:
+            continue
+        for metric in COMPARED_METRICS:
+            limit = reference[metric] * (1 + tolerance) + ABSOLUTE_SLACK[metric]
+            if entry[metric] > limit:
+                regressions.append(
+                    f"{case_key(entry)} {metric}: {entry[metric]} > {reference[metric]} (+{tolerance:.0%})"
+                )
+    return regressions
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the rendering pipeline and the CLI across durations.")
+    parser.add_argument("--targets", nargs="+", choices=TARGETS, default=list(TARGETS))
+    parser.add_argument("--profiles", nargs="+", choices=RENDER_PROFILE_NAMES, default=[DEFAULT_RENDER_PROFILE])
+    parser.add_argument("--durations", type=int, nargs="+", default=DEFAULT_DURATIONS)
+    parser.add_argument("--resolutions", nargs="+", default=DEFAULT_RESOLUTIONS, help="Synthetic source sizes (WxH)")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per case; metrics are the median")
+    parser.add_argument("--output", type=Path, help="Write results as JSON to this file")
+    parser.add_argument("--baseline", type=Path, help="Fail when a case is slower or larger than this result file")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative increase over the baseline")
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv or sys.argv[1:])
+    if args.case:
+        print(json.dumps(run_case(json.loads(args.case))))
+        return 0
+
+    results = []
+    with TemporaryDirectory() as temp_dir:
+        work_dir = Path(temp_dir)
+        for resolution in args.resolutions:
+            width, height = (int(value) for value in resolution.split("x"))
+            image_path = make_source_image(work_dir / f"source_{resolution}.png", width, height)
+            for duration in args.durations:
+                for target in args.targets:
+                    for profile in args.profiles:
+                        case = {
+                            "target": target,
+                            "profile": profile,
+                            "resolution": resolution,
+                            "duration_sec": duration,
+                            "image_path": str(image_path),
+                            "work_dir": str(work_dir),
+                        }
+                        results.append(run_isolated(case, args.repeat))
+                        print(json.dumps(results[-1]), file=sys.stderr)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+    else:
+        print(json.dumps(results, indent=2))
+
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
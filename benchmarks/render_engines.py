@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from worker.pipeline import RENDER_ENGINES, _probe_duration, generate_video_from_image  # noqa: E402
+
+# How far the probed output may drift from the requested duration before the run counts as broken.
+DURATION_TOLERANCE_SEC = 0.1
+
+
+def make_source_image(path: Path, width: int, height: int) -> Path:
+    subprocess.run(
+        ["ffmpeg", "-y", "-f", "lavfi", "-i", f"testsrc2=size={width}x{height}", "-frames:v", "1", str(path)],
+        check=True,
+        capture_output=True,
+    )
+    return path
+
+
+def run_engine(image_path: Path, work_dir: Path, engine: str, duration: int) -> dict[str, object]:
+    output_path = work_dir / f"{engine}_{duration}s.mp4"
+    started = time.perf_counter()
+    result = generate_video_from_image(
+        {
+            "duration_sec": duration,
+            "seed": 1,
+            "image_path": str(image_path),
+            "output_path": str(output_path),
+            "render_engine": engine,
+        }
+    )
+    return {
+        "engine": engine,
+        "duration_sec": duration,
+        "wall_sec": round(time.perf_counter() - started, 3),
+        "bytes_written": result["render"]["bytes_written"],
+        "output_bytes": output_path.stat().st_size,
+        "final_duration_sec": result["final_duration_sec"],
+        # Measured on the file itself: the pipeline reports the planned duration, not what was encoded.
+        "probed_duration_sec": round(_probe_duration(output_path), 3),
+        "timings": result["timings"],
+    }
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare wall time and disk writes of the render engines.")
+    parser.add_argument("--durations", type=int, nargs="+", default=[10, 120, 300])
+    parser.add_argument("--engines", nargs="+", choices=RENDER_ENGINES, default=list(RENDER_ENGINES))
+    parser.add_argument("--resolution", default="4000x3000", help="Synthetic source image size (WxH)")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv or sys.argv[1:])
+    width, height = (int(value) for value in args.resolution.split("x"))
+
+    results = []
+    with TemporaryDirectory() as temp_dir:
+        work_dir = Path(temp_dir)
+        image_path = make_source_image(work_dir / "source.png", width, height)
+        for duration in args.durations:
+            for engine in args.engines:
+                results.append(run_engine(image_path, work_dir, engine, duration))
+                (work_dir / f"{engine}_{duration}s.mp4").unlink()
+
+    print(json.dumps(results, indent=2))
+    short = [row for row in results if abs(row["probed_duration_sec"] - row["duration_sec"]) > DURATION_TOLERANCE_SEC]
+    return 1 if short else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from redis import Redis
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from common.job_store import set_job, update_job  # noqa: E402
+
+# Opens N concurrent GET /jobs/{id}/events streams against a running backend, publishes progress
+# updates through common.job_store and reports how many arrived and how late.
+
+
+async def subscribe(
+    host: str,
+    port: int,
+    job_id: str,
+    expected: int,
+    sent_at: dict[tuple[str, int], float],
+    latencies: list[float],
+) -> int:
+    reader, writer = await asyncio.open_connection(host, port)
+    # HTTP/1.0 keeps the body unchunked, so every SSE line arrives intact.
+    writer.write(f"GET /jobs/{job_id}/events HTTP/1.0\r\nHost: {host}\r\nAccept: text/event-stream\r\n\r\n".encode())
+    await writer.drain()
+
+    received = 0
+    try:
+        while received < expected:
+            line = await reader.readline()
+            if not line:
+                break
+            if not line.startswith(b"data: "):
+                continue
+            # Updates carry the job's status, so each one is matched to its send time by progress step.
+            sent = sent_at.get((job_id, json.loads(line[6:])["progress"]))
+            if sent is not None:
+                latencies.append(time.time() - sent)
+                received += 1
+    finally:
+        writer.close()
+    return received
+
+
+async def run(args: argparse.Namespace) -> dict[str, float | int]:
+    redis_client = Redis.from_url(args.redis_url)
+    target = urlsplit(args.base_url)
+    job_ids = [f"loadtest-{uuid.uuid4()}" for _ in range(args.jobs)]
+    for job_id in job_ids:
+        set_job(redis_client, job_id, {"id": job_id, "type": "video", "status": "running", "progress": 0}, 600)
+
+    sent_at: dict[tuple[str, int], float] = {}
+    latencies: list[float] = []
+    host, port = target.hostname or "localhost", target.port or 80
+    subscribers = [
+        asyncio.create_task(subscribe(host, port, job_ids[index % len(job_ids)], args.updates, sent_at, latencies))
+        for index in range(args.subscribers)
+    ]
+    await asyncio.sleep(args.connect_wait)
+
+    started = time.perf_counter()
+    for step in range(1, args.updates + 1):
+        for job_id in job_ids:
+            sent_at[(job_id, step)] = time.time()
+            update_job(redis_client, job_id, progress=step)
+        await asyncio.sleep(args.interval)
+    received = sum(await asyncio.wait_for(asyncio.gather(*subscribers), timeout=args.timeout))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "subscribers": args.subscribers,
+        "jobs": args.jobs,
+        "expected_events": args.subscribers * args.updates,
+        "received_events": received,
+        "events_per_sec": round(received / elapsed, 1),
+        "latency_p50_ms": round(statistics.median(latencies) * 1000, 2) if latencies else 0.0,
+        "latency_p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 2) if latencies else 0.0,
+    }
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load test the job event stream.")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--redis-url", default="redis://localhost:6379/0")
+    parser.add_argument("--subscribers", type=int, default=2000)
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--updates", type=int, default=20, help="Progress steps per job (at most 100)")
+    parser.add_argument("--interval", type=float, default=0.25, help="Seconds between update rounds")
+    parser.add_argument("--connect-wait", type=float, default=5.0, help="Seconds to let subscribers connect")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv or sys.argv[1:])
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
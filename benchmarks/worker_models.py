@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from redis import Redis  # noqa: E402
+from rq import Queue  # noqa: E402
+from rq.job import Job  # noqa: E402
+
+# Per-job startup overhead and host throughput of the forking worker (one single-job worker per core,
+# as with one container per core) against one host process with the same number of pre-warmed slots.
+# The queue is filled before the workers start, so every slot-second is spent either on a job body or
+# on per-job overhead. Needs Redis (and ffmpeg for --kind render):
+#   docker compose -f infra/docker-compose.yml up -d redis
+#   python benchmarks/worker_models.py --slots 4 --jobs 80
+MODELS = ("fork", "slots")
+KINDS = ("noop", "render")
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def bench_job(kind: str, prepared_path: str, duration: int, output_dir: str) -> dict[str, float]:
+    entered = time.time()
+    # Every real job resolves its function from this module; a forked horse imports it from scratch.
+    import worker.app.tasks  # noqa: F401
+
+    ready = time.time()
+    if kind == "render":
+        from worker.pipeline import render_segment
+
+        segment = {"segment_index": 0, "duration_sec": duration}
+        output_path = Path(output_dir) / f"{uuid.uuid4().hex}.mp4"
+        render_segment(Path(prepared_path), segment, output_path)
+        output_path.unlink()
+    return {"entered": entered, "ready": ready, "finished": time.time()}
+
+
+def _start_workers(model: str, slots: int, queue_name: str, redis_url: str) -> list[subprocess.Popen[bytes]]:
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")])),
+        "REDIS_URL": redis_url,
+        "WORKER_QUEUES": queue_name,
+        "WORKER_QUEUE_WEIGHTS": "",
+        "WORKER_QUEUE_MAX_WAIT_SECONDS": "",
+        "WORKER_METRICS_PORT": "0",
+        "WORKER_SLOTS": str(slots if model == "slots" else 0),
+    }
+    command = [sys.executable, "-m", "worker.app.worker"]
+    count = 1 if model == "slots" else slots
+    return [
+        subprocess.Popen(command, env=env, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        for _ in range(count)
+    ]
+
+
+def _stop_workers(processes: list[subprocess.Popen[bytes]]) -> float:
+    # Times the warm shutdown a scale-in would see once the queue is empty.
+    started = time.perf_counter()
+    for process in processes:
+        process.send_signal(signal.SIGTERM)
+    for process in processes:
+        try:
+            process.wait(timeout=60)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+    return time.perf_counter() - started
+
+
+def run_model(model: str, args: argparse.Namespace, prepared_path: Path, work_dir: Path) -> dict[str, Any]:
+    connection = Redis.from_url(args.redis_url)
+    queue = Queue(f"bench-{model}-{uuid.uuid4().hex[:8]}", connection=connection)
+    jobs = [
+        queue.enqueue(
+            "benchmarks.worker_models.bench_job",
+            args.kind,
+            str(prepared_path),
+            args.duration,
+            str(work_dir),
+            job_timeout=600,
+            result_ttl=3600,
+        )
+        for _ in range(args.jobs)
+    ]
+
+    processes = _start_workers(model, args.slots, queue.name, args.redis_url)
+    try:
+        deadline = time.monotonic() + args.timeout
+        while True:
+            statuses = [job.get_status(refresh=True) for job in Job.fetch_many([job.id for job in jobs], connection)]
+            if all(status in ("finished", "failed") for status in statuses):
+                break
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"{model}: jobs still pending after {args.timeout}s")
+            time.sleep(0.2)
+    finally:
+        shutdown_sec = _stop_workers(processes)
+
+    results = [job.return_value() for job in Job.fetch_many([job.id for job in jobs], connection)]
+    done = [result for result in results if result]
+    queue.delete(delete_jobs=True)
+    if not done:
+        return {"model": model, "slots": args.slots, "kind": args.kind, "jobs": args.jobs, "failed": len(results)}
+
+    # Wall from the first job body to the last, so interpreter start-up is not charged to the jobs.
+    wall_sec = max(result["finished"] for result in done) - min(result["entered"] for result in done)
+    body_sec = sum(result["finished"] - result["ready"] for result in done)
+    return {
+        "model": model,
+        "slots": args.slots,
+        "kind": args.kind,
+        "jobs": len(done),
+        "failed": len(results) - len(done),
+        "wall_sec": round(wall_sec, 3),
+        "jobs_per_min": round(len(done) * 60 / wall_sec, 1) if wall_sec > 0 else 0.0,
+        "overhead_per_job_ms": round(max(0.0, wall_sec * args.slots - body_sec) / len(done) * 1000, 1),
+        "import_p50_ms": round(statistics.median(result["ready"] - result["entered"] for result in done) * 1000, 1),
+        "shutdown_sec": round(shutdown_sec, 3),
+    }
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare the forking worker with pre-warmed worker slots.")
+    parser.add_argument("--redis-url", default=os.environ.get("REDIS_URL", "redis://localhost:6379/0"))
+    parser.add_argument("--models", nargs="+", choices=MODELS, default=list(MODELS))
+    parser.add_argument("--slots", type=int, default=os.cpu_count() or 1, help="Concurrent jobs per host")
+    parser.add_argument("--jobs", type=int, default=40)
+    parser.add_argument("--kind", choices=KINDS, default="noop", help="noop isolates overhead; render adds ffmpeg")
+    parser.add_argument("--duration", type=int, default=2, help="Seconds of video per render job")
+    parser.add_argument("--timeout", type=float, default=900, help="Give up on a model after this many seconds")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv or sys.argv[1:])
+    results = []
+    with TemporaryDirectory() as temp_dir:
+        work_dir = Path(temp_dir)
+        prepared_path = work_dir / "source.ppm"
+        if args.kind == "render":
+            from benchmarks.render_engines import make_source_image
+            from worker.pipeline import prepare_source_image
+
+            prepare_source_image(make_source_image(work_dir / "source.png", 1920, 1080), prepared_path)
+        for model in args.models:
+            results.append(run_model(model, args, prepared_path, work_dir))
+            print(json.dumps(results[-1]), file=sys.stderr)
+
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
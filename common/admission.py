@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+
+# Every admitted job reserves its estimated render seconds against the global and per-tenant backlog
+# until the worker releases it. A reservation whose job never reports back (worker killed, dependency
+# never ran) is dropped once its expiry passes, so lost releases cannot shrink capacity for good.
+BACKLOG_KEY = "admission:backlog"
+RESERVATIONS_KEY = "admission:jobs"
+EXPIRY_KEY = "admission:expiry"
+# RQ registers every live worker in this set.
+RQ_WORKERS_KEY = "rq:workers"
+
+_RELEASE_FUNCTION = """
+local function release(job_id)
+    local entry = redis.call('HGET', KEYS[2], job_id)
+    if not entry then
+        return 0
+    end
+    local separator = string.find(entry, '|', 1, true)
+    local cost = tonumber(string.sub(entry, 1, separator - 1))
+    local tenant_field = 'tenant:' .. string.sub(entry, separator + 1)
+    for _, field in ipairs({'global', tenant_field}) do
+        if tonumber(redis.call('HINCRBYFLOAT', KEYS[1], field, -cost)) < 0.001 then
+            redis.call('HDEL', KEYS[1], field)
+        end
+    end
+    redis.call('HDEL', KEYS[2], job_id)
+    redis.call('ZREM', KEYS[3], job_id)
+    return 1
+end
+"""
+
+_ADMIT_SCRIPT = _RELEASE_FUNCTION + """
+for _, job_id in ipairs(redis.call('ZRANGEBYSCORE', KEYS[3], '-inf', ARGV[6])) do
+    release(job_id)
+end
+local cost = tonumber(ARGV[3])
+local global = tonumber(redis.call('HGET', KEYS[1], 'global') or '0')
+local tenant = tonumber(redis.call('HGET', KEYS[1], 'tenant:' .. ARGV[2]) or '0')
+local global_cap = tonumber(ARGV[4])
+local tenant_cap = tonumber(ARGV[5])
+-- An idle scope always admits, so a single job larger than the cap can still run.
+if global_cap > 0 and global > 0 and global + cost > global_cap then
+    return {0, tostring(global), tostring(global + cost - global_cap)}
+end
+if tenant_cap > 0 and tenant > 0 and tenant + cost > tenant_cap then
+    return {0, tostring(global), tostring(tenant + cost - tenant_cap)}
+end
+redis.call('HINCRBYFLOAT', KEYS[1], 'global', cost)
+redis.call('HINCRBYFLOAT', KEYS[1], 'tenant:' .. ARGV[2], cost)
+redis.call('HSET', KEYS[2], ARGV[1], ARGV[3] .. '|' .. ARGV[2])
+redis.call('ZADD', KEYS[3], ARGV[7], ARGV[1])
+return {1, tostring(global), '0'}
+"""
+
+_RELEASE_SCRIPT = _RELEASE_FUNCTION + """
+return release(ARGV[1])
+"""
+
+
+async def reserve_backlog_async(
+    redis_client: AsyncRedis,
+    job_id: str,
+    tenant: str,
+    render_seconds: float,
+    global_cap_seconds: int,
+    tenant_cap_seconds: int,
+    now: float,
+    expires_at: float,
+) -> tuple[bool, float, float]:
+    # Returns (admitted, global backlog seconds ahead of this job, seconds over the cap when rejected).
+    admitted, backlog, excess = await redis_client.eval(
+        _ADMIT_SCRIPT,
+        3,
+        BACKLOG_KEY,
+        RESERVATIONS_KEY,
+        EXPIRY_KEY,
+        job_id,
+        tenant,
+        render_seconds,
+        global_cap_seconds,
+        tenant_cap_seconds,
+        now,
+        expires_at,
+    )
+    return bool(admitted), float(backlog), float(excess)
+
+
+def release_backlog(redis_client: Redis, job_id: str) -> bool:
+    return bool(redis_client.eval(_RELEASE_SCRIPT, 3, BACKLOG_KEY, RESERVATIONS_KEY, EXPIRY_KEY, job_id))
+
+
+async def release_backlog_async(redis_client: AsyncRedis, job_id: str) -> bool:
+    return bool(await redis_client.eval(_RELEASE_SCRIPT, 3, BACKLOG_KEY, RESERVATIONS_KEY, EXPIRY_KEY, job_id))
+
+
+async def count_workers_async(redis_client: AsyncRedis) -> int:
+    return int(await redis_client.scard(RQ_WORKERS_KEY))
+
+
+async def get_backlog_seconds_async(redis_client: AsyncRedis) -> float:
+    return float(await redis_client.hget(BACKLOG_KEY, "global") or 0)
@@ -14,3 +14,69 @@ PUBLIC_BASE_URL = env("PUBLIC_BASE_URL", "http://localhost:9000")
 
 JOB_MAX_TIMEOUT_SECONDS = int(env("JOB_MAX_TIMEOUT_SECONDS", "1800"))
 SEGMENT_MAX_TIMEOUT_SECONDS = int(env("SEGMENT_MAX_TIMEOUT_SECONDS", "300"))
+SEGMENT_RENDER_CONCURRENCY = int(env("SEGMENT_RENDER_CONCURRENCY", "1"))
+FFMPEG_THREADS = int(env("FFMPEG_THREADS", "0"))
+
+SEGMENT_CACHE_ENABLED = env("SEGMENT_CACHE_ENABLED", "true").lower() == "true"
+SEGMENT_CACHE_MAX_BYTES = int(env("SEGMENT_CACHE_MAX_BYTES", str(20 * 1024**3)))
+SEGMENT_CACHE_MAX_AGE_SECONDS = int(env("SEGMENT_CACHE_MAX_AGE_SECONDS", str(7 * 24 * 3600)))
+SEGMENT_CACHE_EVICT_INTERVAL_SECONDS = int(env("SEGMENT_CACHE_EVICT_INTERVAL_SECONDS", "300"))
+# A segment encode that times out or fails is retried this many times with the fast fallback settings.
+SEGMENT_RETRY_ATTEMPTS = int(env("SEGMENT_RETRY_ATTEMPTS", "2"))
+# Without the segment cache, finished segments of a running job are kept in object storage so an RQ
+# retry of the job renders only the missing ones.
+SEGMENT_CHECKPOINTS_ENABLED = env("SEGMENT_CHECKPOINTS_ENABLED", "true").lower() == "true"
+
+UPLOAD_MAX_BYTES = int(env("UPLOAD_MAX_BYTES", str(100 * 1024**2)))
+UPLOAD_PART_SIZE_BYTES = max(5 * 1024**2, int(env("UPLOAD_PART_SIZE_BYTES", str(8 * 1024**2))))
+
+TRANSFER_CHUNK_SIZE_BYTES = int(env("TRANSFER_CHUNK_SIZE_BYTES", str(16 * 1024**2)))
+TRANSFER_MAX_CONCURRENCY = int(env("TRANSFER_MAX_CONCURRENCY", "8"))
+
+PROGRESS_PUBLISH_INTERVAL_SECONDS = float(env("PROGRESS_PUBLISH_INTERVAL_SECONDS", "1.0"))
+
+# 0 keeps records forever.
+JOB_FINISHED_TTL_SECONDS = int(env("JOB_FINISHED_TTL_SECONDS", str(7 * 24 * 3600)))
+UPLOAD_TTL_SECONDS = int(env("UPLOAD_TTL_SECONDS", str(7 * 24 * 3600)))
+JOB_STATUS_BULK_LIMIT = int(env("JOB_STATUS_BULK_LIMIT", "500"))
+
+JOB_EVENTS_KEEPALIVE_SECONDS = float(env("JOB_EVENTS_KEEPALIVE_SECONDS", "15"))
+JOB_EVENTS_SUBSCRIBER_BUFFER = int(env("JOB_EVENTS_SUBSCRIBER_BUFFER", "64"))
+
+BACKEND_REDIS_MAX_CONNECTIONS = int(env("BACKEND_REDIS_MAX_CONNECTIONS", "64"))
+BACKEND_REDIS_POOL_TIMEOUT_SECONDS = float(env("BACKEND_REDIS_POOL_TIMEOUT_SECONDS", "5"))
+BACKEND_S3_MAX_CONNECTIONS = int(env("BACKEND_S3_MAX_CONNECTIONS", "64"))
+
+PRESIGN_EXPIRES_SECONDS = int(env("PRESIGN_EXPIRES_SECONDS", "900"))
+PRESIGN_MULTIPART_THRESHOLD_BYTES = int(env("PRESIGN_MULTIPART_THRESHOLD_BYTES", str(64 * 1024**2)))
+RESULT_URL_EXPIRES_SECONDS = int(env("RESULT_URL_EXPIRES_SECONDS", "900"))
+
+# Identical POST /jobs submissions attach to the in-flight job or reuse a result this recent (0 disables reuse).
+JOB_DEDUP_ENABLED = env("JOB_DEDUP_ENABLED", "true").lower() == "true"
+JOB_DEDUP_RETENTION_SECONDS = int(env("JOB_DEDUP_RETENTION_SECONDS", str(24 * 3600)))
+
+# Estimated render cost (output seconds plus per-segment overhead) picks the queue tier.
+SCHEDULER_SHORT_MAX_COST = float(env("SCHEDULER_SHORT_MAX_COST", "30"))
+SCHEDULER_STANDARD_MAX_COST = float(env("SCHEDULER_STANDARD_MAX_COST", "180"))
+SCHEDULER_SEGMENT_OVERHEAD_COST = float(env("SCHEDULER_SEGMENT_OVERHEAD_COST", "3"))
+# "<queue>:<value>" lists. Weights set each tier's share of dequeues; a tier whose oldest job has
+# waited longer than its max wait is served first regardless of weight.
+WORKER_QUEUES = env("WORKER_QUEUES", "video-short,video,video-long")
+WORKER_QUEUE_WEIGHTS = env("WORKER_QUEUE_WEIGHTS", "video-short:6,video:3,video-long:1")
+WORKER_QUEUE_MAX_WAIT_SECONDS = env("WORKER_QUEUE_MAX_WAIT_SECONDS", "video-short:30,video:300")
+# Cluster-wide cap on workers listening on or running a tier. Keep it below the worker count so the remaining
+# workers are always free for the other tiers, however many long jobs are queued.
+WORKER_QUEUE_MAX_RUNNING = env("WORKER_QUEUE_MAX_RUNNING", "video-long:2")
+
+# Estimated render seconds allowed in flight (queued + running); 0 disables the cap.
+ADMISSION_GLOBAL_MAX_BACKLOG_SECONDS = int(env("ADMISSION_GLOBAL_MAX_BACKLOG_SECONDS", str(4 * 3600)))
+ADMISSION_TENANT_MAX_BACKLOG_SECONDS = int(env("ADMISSION_TENANT_MAX_BACKLOG_SECONDS", str(3600)))
+THROUGHPUT_EWMA_ALPHA = float(env("THROUGHPUT_EWMA_ALPHA", "0.2"))
+# Render seconds per unit of scheduler cost until real measurements exist.
+THROUGHPUT_DEFAULT_SECONDS_PER_COST = float(env("THROUGHPUT_DEFAULT_SECONDS_PER_COST", "1.0"))
+
+# Port of the worker's Prometheus exporter (needs PROMETHEUS_MULTIPROC_DIR); 0 disables it.
+WORKER_METRICS_PORT = int(env("WORKER_METRICS_PORT", "0"))
+# Job slots per worker host. 0 runs one job at a time in a freshly forked work horse; N runs N long-lived
+# slot processes that import the task modules once and split the host's cores between them.
+WORKER_SLOTS = int(env("WORKER_SLOTS", "0"))
@@ -5,29 +5,37 @@ from datetime import datetime, timezone
 from typing import Any
 
 from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+
+from common.config import JOB_FINISHED_TTL_SECONDS
+
+FINISHED_STATUSES = frozenset({"succeeded", "failed"})
+JOB_EVENTS_CHANNEL_PREFIX = "job-events:"
 
 
 def utc_now() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+def _job_key(job_id: str) -> str:
+    return f"job:{job_id}"
+
+
+def _timings_key(job_id: str) -> str:
+    return f"job-timings:{job_id}"
+
+
+def _hls_segments_key(job_id: str) -> str:
+    return f"job-hls:{job_id}"
+
+
 def _serialize(value: Any) -> str:
     if isinstance(value, (dict, list)):
         return json.dumps(value, ensure_ascii=False)
     return str(value)
 
 
-def set_job(redis_client: Redis, job_id: str, payload: dict[str, Any]) -> None:
-    key = f"job:{job_id}"
-    data = {k: _serialize(v) for k, v in payload.items()}
-    redis_client.hset(key, mapping=data)
-
-
-def get_job(redis_client: Redis, job_id: str) -> dict[str, str] | None:
-    key = f"job:{job_id}"
-    data = redis_client.hgetall(key)
-    if not data:
-        return None
+def _decode_hash(data: dict[Any, Any]) -> dict[str, str]:
     return {
         (k.decode() if isinstance(k, bytes) else str(k)): (
             v.decode() if isinstance(v, bytes) else str(v)
@@ -36,6 +44,138 @@ def get_job(redis_client: Redis, job_id: str) -> dict[str, str] | None:
     }
 
 
-def update_job(redis_client: Redis, job_id: str, **fields: Any) -> None:
+def job_events_channel(job_id: str) -> str:
+    return f"{JOB_EVENTS_CHANNEL_PREFIX}{job_id}"
+
+
+# Writes the fields and publishes the whole record in one step, so subscribers never read the hash back
+# and never receive an older state after a newer one.
+_WRITE_AND_PUBLISH_SCRIPT = """
+redis.call('HSET', KEYS[1], unpack(ARGV, 3))
+if tonumber(ARGV[1]) > 0 then
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+elseif tonumber(ARGV[1]) < 0 then
+    redis.call('PERSIST', KEYS[1])
+end
+local fields = redis.call('HGETALL', KEYS[1])
+local job = {}
+for index = 1, #fields, 2 do
+    job[fields[index]] = fields[index + 1]
+end
+redis.call('PUBLISH', ARGV[2], cjson.encode(job))
+"""
+
+
+def _update_args(job_id: str, fields: dict[str, Any]) -> list[Any]:
     fields["updated_at"] = utc_now()
-    set_job(redis_client, job_id, fields)
+    # Finished jobs start their retention countdown; running ones never expire under a worker, so a job
+    # moving back out of a finished state (-1) drops any countdown it had.
+    status = str(fields.get("status", ""))
+    ttl_seconds = JOB_FINISHED_TTL_SECONDS if status in FINISHED_STATUSES else (-1 if status else 0)
+    args: list[Any] = [_job_key(job_id), ttl_seconds, job_events_channel(job_id)]
+    for field, value in fields.items():
+        args.extend([field, _serialize(value)])
+    return args
+
+
+def _write_job(redis_client: Redis, job_id: str, payload: dict[str, Any], ttl_seconds: int | None) -> None:
+    key = _job_key(job_id)
+    data = {k: _serialize(v) for k, v in payload.items()}
+    if not ttl_seconds:
+        redis_client.hset(key, mapping=data)
+        return
+
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.hset(key, mapping=data)
+    pipe.expire(key, ttl_seconds)
+    pipe.execute()
+
+
+def set_job(redis_client: Redis, job_id: str, payload: dict[str, Any], ttl_seconds: int | None = None) -> None:
+    _write_job(redis_client, job_id, payload, ttl_seconds)
+
+
+def get_job(redis_client: Redis, job_id: str) -> dict[str, str] | None:
+    data = redis_client.hgetall(_job_key(job_id))
+    if not data:
+        return None
+    return _decode_hash(data)
+
+
+def get_jobs(redis_client: Redis, job_ids: list[str]) -> list[dict[str, str] | None]:
+    pipe = redis_client.pipeline(transaction=False)
+    for job_id in job_ids:
+        pipe.hgetall(_job_key(job_id))
+    return [_decode_hash(data) if data else None for data in pipe.execute()]
+
+
+def update_job(redis_client: Redis, job_id: str, **fields: Any) -> None:
+    redis_client.eval(_WRITE_AND_PUBLISH_SCRIPT, 1, *_update_args(job_id, fields))
+
+
+def append_job_timings(redis_client: Redis, job_id: str, entries: list[dict[str, Any]]) -> None:
+    # A list rather than a hash field: segments of a distributed job append from different workers at once.
+    if not entries:
+        return
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.rpush(_timings_key(job_id), *(json.dumps(entry, ensure_ascii=False) for entry in entries))
+    if JOB_FINISHED_TTL_SECONDS:
+        pipe.expire(_timings_key(job_id), JOB_FINISHED_TTL_SECONDS)
+    pipe.execute()
+
+
+def record_hls_segment(redis_client: Redis, job_id: str, segment_index: int, entry: dict[str, Any]) -> None:
+    # Keyed by index so a retried job that republishes its segments overwrites rather than duplicates them.
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.hset(_hls_segments_key(job_id), str(segment_index), json.dumps(entry, ensure_ascii=False))
+    if JOB_FINISHED_TTL_SECONDS:
+        pipe.expire(_hls_segments_key(job_id), JOB_FINISHED_TTL_SECONDS)
+    pipe.execute()
+
+
+def increment_job_field(redis_client: Redis, job_id: str, field: str, amount: int = 1) -> int:
+    return int(redis_client.hincrby(_job_key(job_id), field, amount))
+
+
+async def set_job_async(
+    redis_client: AsyncRedis,
+    job_id: str,
+    payload: dict[str, Any],
+    ttl_seconds: int | None = None,
+) -> None:
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.hset(_job_key(job_id), mapping={k: _serialize(v) for k, v in payload.items()})
+    if ttl_seconds:
+        pipe.expire(_job_key(job_id), ttl_seconds)
+    await pipe.execute()
+
+
+async def update_job_async(redis_client: AsyncRedis, job_id: str, **fields: Any) -> None:
+    await redis_client.eval(_WRITE_AND_PUBLISH_SCRIPT, 1, *_update_args(job_id, fields))
+
+
+async def get_job_async(redis_client: AsyncRedis, job_id: str) -> dict[str, str] | None:
+    data = await redis_client.hgetall(_job_key(job_id))
+    if not data:
+        return None
+    return _decode_hash(data)
+
+
+async def get_jobs_async(redis_client: AsyncRedis, job_ids: list[str]) -> list[dict[str, str] | None]:
+    pipe = redis_client.pipeline(transaction=False)
+    for job_id in job_ids:
+        pipe.hgetall(_job_key(job_id))
+    return [_decode_hash(data) if data else None for data in await pipe.execute()]
+
+
+async def get_job_timings_async(redis_client: AsyncRedis, job_id: str) -> list[dict[str, Any]]:
+    return [json.loads(entry) for entry in await redis_client.lrange(_timings_key(job_id), 0, -1)]
+
+
+async def get_hls_segments_async(redis_client: AsyncRedis, job_id: str) -> dict[int, dict[str, Any]]:
+    data = _decode_hash(await redis_client.hgetall(_hls_segments_key(job_id)))
+    return {int(index): json.loads(entry) for index, entry in data.items()}
+
+
+async def delete_job_async(redis_client: AsyncRedis, job_id: str) -> bool:
+    return bool(await redis_client.delete(_job_key(job_id)))
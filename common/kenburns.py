@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from typing import IO
+
+import numpy as np
+from PIL import Image
+
+# Frame synthesis for the slow push-in that ffmpeg's zoompan otherwise produces. The motion is fixed
+# by the zoom speed, so every crop window is computed up front and frames are resampled straight
+# from the decoded source and streamed to the encoder as rawvideo.
+
+
+def zoom_windows(frame_count: int, zoom_speed: float, zoom_max: float, width: int, height: int) -> np.ndarray:
+    # zoompan's z='min(zoom+speed,max)' centred on the source: frame n shows 1/zoom_n of each side.
+    zoom = np.minimum(1.0 + zoom_speed * np.arange(1, frame_count + 1), zoom_max)
+    window_width = width / zoom
+    window_height = height / zoom
+    left = (width - window_width) / 2
+    top = (height - window_height) / 2
+    return np.stack([left, top, left + window_width, top + window_height], axis=1)
+
+
+def synthesize_frames(source: Image.Image, windows: np.ndarray, size: tuple[int, int]) -> Iterator[bytes]:
+    # Once the zoom reaches its cap every window is the same, so the last frame is re-sent as is.
+    repeats = np.zeros(len(windows), dtype=bool)
+    repeats[1:] = np.all(windows[1:] == windows[:-1], axis=1)
+    frame = b""
+    for box, repeat in zip(windows.tolist(), repeats.tolist()):
+        if not repeat:
+            frame = source.resize(size, Image.Resampling.BILINEAR, box=tuple(box)).tobytes()
+        yield frame
+
+
+def rawvideo_input_args(width: int, height: int, fps: int) -> list[str]:
+    return ["-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{width}x{height}", "-r", str(fps), "-i", "pipe:0"]
+
+
+def feed_frames(stdin: IO[bytes], frames: Iterator[bytes]) -> None:
+    try:
+        for frame in frames:
+            stdin.write(frame)
+    except BrokenPipeError:
+        # The encoder exited early; its return code carries the reason.
+        pass
+    finally:
+        try:
+            stdin.close()
+        except BrokenPipeError:
+            pass
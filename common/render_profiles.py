@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+# x264 settings per named profile. The source is a single still under slow motion, so "stillimage"
+# tuning and long GOPs cost little quality; the preset decides most of the encode time and CRF most
+# of the file size. threads=0 leaves the choice to ffmpeg or to the render parallelism split.
+# `python benchmarks/pipeline_suite.py --profiles draft standard high` measures each profile.
+# Measured on 1 vCPU (Intel Xeon), ffmpeg 7.0.2 static, 1920x1080 source, 60 s video: draft 54 s / 0.24 MB,
+# standard 119 s / 0.93 MB, high 498 s / 27.6 MB (wall time / output size; full table in the README).
+RENDER_PROFILES: dict[str, dict[str, str | int]] = {
+    "draft": {"preset": "ultrafast", "crf": 30, "tune": "stillimage", "gop_seconds": 10, "threads": 1},
+    "standard": {"preset": "medium", "crf": 23, "tune": "stillimage", "gop_seconds": 4, "threads": 0},
+    "high": {"preset": "slow", "crf": 18, "tune": "stillimage", "gop_seconds": 2, "threads": 0},
+}
+RENDER_PROFILE_NAMES = tuple(RENDER_PROFILES)
+DEFAULT_RENDER_PROFILE = "standard"
+# Motion search, trellis and lookahead of each x264 preset, fastest first. A segment that timed out or
+# failed is re-encoded with the values of a preset FALLBACK_PRESET_STEPS faster than its own. These
+# settings leave the SPS/PPS alone, so the retried segment still joins its neighbours by stream copy;
+# switching the preset itself would also change reference frames, CABAC and the 8x8 transform.
+X264_PRESET_ANALYSIS = {
+    "ultrafast": "me=dia:subme=0:trellis=0:mixed-refs=0:rc-lookahead=0",
+    "superfast": "me=dia:subme=1:trellis=0:mixed-refs=0:rc-lookahead=0",
+    "veryfast": "me=hex:subme=2:trellis=0:mixed-refs=0:rc-lookahead=10",
+    "faster": "me=hex:subme=4:trellis=1:mixed-refs=0:rc-lookahead=20",
+    "fast": "me=hex:subme=6:trellis=1:mixed-refs=1:rc-lookahead=30",
+    "medium": "me=hex:subme=7:trellis=1:mixed-refs=1:rc-lookahead=40",
+    "slow": "me=umh:subme=8:trellis=2:mixed-refs=1:rc-lookahead=50",
+    "slower": "me=umh:subme=9:trellis=2:mixed-refs=1:rc-lookahead=60",
+    "veryslow": "me=umh:subme=10:trellis=2:mixed-refs=1:rc-lookahead=60",
+}
+X264_PRESETS = tuple(X264_PRESET_ANALYSIS)
+FALLBACK_PRESET_STEPS = 2
+
+
+def get_render_profile(name: str) -> dict[str, str | int]:
+    if name not in RENDER_PROFILES:
+        raise ValueError(f"render_profile must be one of {', '.join(RENDER_PROFILE_NAMES)}")
+    return RENDER_PROFILES[name]
+
+
+def fallback_x264_params(preset: str) -> str | None:
+    # None when the preset is already the fastest: the retry then simply runs the same encode again.
+    position = X264_PRESETS.index(preset)
+    if position == 0:
+        return None
+    return X264_PRESET_ANALYSIS[X264_PRESETS[max(0, position - FALLBACK_PRESET_STEPS)]]
+
+
+def build_encoder_args(profile_name: str, fps: int, fallback: bool = False) -> list[str]:
+    profile = get_render_profile(profile_name)
+    fallback_params = fallback_x264_params(str(profile["preset"])) if fallback else None
+    return [
+        "-r",
+        str(fps),
+        "-c:v",
+        "libx264",
+        "-preset",
+        str(profile["preset"]),
+        "-crf",
+        str(profile["crf"]),
+        "-tune",
+        str(profile["tune"]),
+        "-g",
+        str(int(profile["gop_seconds"]) * fps),
+        "-pix_fmt",
+        "yuv420p",
+        *(["-x264-params", fallback_params] if fallback_params else []),
+    ]
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import math
+
+from redis import Redis
+
+from common.config import (
+    SCHEDULER_SEGMENT_OVERHEAD_COST,
+    SCHEDULER_SHORT_MAX_COST,
+    SCHEDULER_STANDARD_MAX_COST,
+)
+
+SHORT_QUEUE = "video-short"
+# The standard tier keeps the original queue name so jobs enqueued before the split still drain.
+STANDARD_QUEUE = "video"
+LONG_QUEUE = "video-long"
+QUEUE_NAMES = (SHORT_QUEUE, STANDARD_QUEUE, LONG_QUEUE)
+
+# A worker listening on or running a tier with a cap in WORKER_QUEUE_MAX_RUNNING holds one of its leases, a
+# member of this sorted set scored by expiry. Leases of workers that died are dropped once they expire.
+TIER_LEASE_KEY_PREFIX = "scheduler:tier-leases:"
+
+# Takes or extends the lease; an extension never moves an expiry earlier.
+_ACQUIRE_TIER_LEASE_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[3])
+local held = redis.call('ZSCORE', KEYS[1], ARGV[1])
+if not held and redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[2]) then
+    return 0
+end
+if not held or tonumber(held) < tonumber(ARGV[4]) then
+    redis.call('ZADD', KEYS[1], ARGV[4], ARGV[1])
+end
+return 1
+"""
+
+# Mirrors the segment bounds in worker.pipeline: a plan never has segments longer than this.
+SEGMENT_MAX_SECONDS = 60
+
+
+def estimate_segment_count(duration_seconds: int) -> int:
+    return max(1, math.ceil(duration_seconds / SEGMENT_MAX_SECONDS))
+
+
+def estimate_render_cost(duration_seconds: int, segment_count: int | None = None) -> float:
+    if segment_count is None:
+        segment_count = estimate_segment_count(duration_seconds)
+    return float(duration_seconds) + segment_count * SCHEDULER_SEGMENT_OVERHEAD_COST
+
+
+def queue_for_cost(cost: float) -> str:
+    if cost <= SCHEDULER_SHORT_MAX_COST:
+        return SHORT_QUEUE
+    if cost <= SCHEDULER_STANDARD_MAX_COST:
+        return STANDARD_QUEUE
+    return LONG_QUEUE
+
+
+def parse_queue_values(spec: str) -> dict[str, float]:
+    values: dict[str, float] = {}
+    for item in spec.split(","):
+        name, _, value = item.strip().partition(":")
+        if name and value:
+            values[name] = float(value)
+    return values
+
+
+def acquire_tier_lease(
+    redis_client: Redis, queue_name: str, holder: str, cap: int, now: float, expires_at: float
+) -> bool:
+    key = f"{TIER_LEASE_KEY_PREFIX}{queue_name}"
+    return bool(redis_client.eval(_ACQUIRE_TIER_LEASE_SCRIPT, 1, key, holder, cap, now, expires_at))
+
+
+def release_tier_lease(redis_client: Redis, queue_name: str, holder: str) -> None:
+    redis_client.zrem(f"{TIER_LEASE_KEY_PREFIX}{queue_name}", holder)
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import math
+
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+
+from common.config import THROUGHPUT_DEFAULT_SECONDS_PER_COST, THROUGHPUT_EWMA_ALPHA
+from common.scheduling import estimate_render_cost
+
+# render-throughput holds an exponentially weighted mean of measured job wall time per
+# "<duration bucket>:<segment count>" plus "per_cost", the same mean normalised by scheduler cost,
+# which covers shapes that have not been measured yet.
+THROUGHPUT_KEY = "render-throughput"
+PER_COST_FIELD = "per_cost"
+DURATION_BUCKET_SECONDS = 10
+
+_RECORD_SCRIPT = """
+local alpha = tonumber(ARGV[3])
+for i = 1, 2 do
+    local sample = tonumber(ARGV[i])
+    local field = i == 1 and ARGV[4] or ARGV[5]
+    local current = tonumber(redis.call('HGET', KEYS[1], field))
+    if current then
+        sample = current + alpha * (sample - current)
+    end
+    redis.call('HSET', KEYS[1], field, tostring(sample))
+end
+return 1
+"""
+
+
+def _shape_field(duration_seconds: int, segment_count: int) -> str:
+    bucket = math.ceil(duration_seconds / DURATION_BUCKET_SECONDS) * DURATION_BUCKET_SECONDS
+    return f"{bucket}:{segment_count}"
+
+
+def record_render_time(redis_client: Redis, duration_seconds: int, segment_count: int, elapsed_seconds: float) -> None:
+    cost = estimate_render_cost(duration_seconds, segment_count)
+    redis_client.eval(
+        _RECORD_SCRIPT,
+        1,
+        THROUGHPUT_KEY,
+        elapsed_seconds,
+        elapsed_seconds / cost,
+        THROUGHPUT_EWMA_ALPHA,
+        _shape_field(duration_seconds, segment_count),
+        PER_COST_FIELD,
+    )
+
+
+async def estimate_render_seconds_async(
+    redis_client: AsyncRedis,
+    duration_seconds: int,
+    segment_count: int,
+) -> float:
+    shape_mean, per_cost = await redis_client.hmget(
+        THROUGHPUT_KEY, _shape_field(duration_seconds, segment_count), PER_COST_FIELD
+    )
+    if shape_mean is not None:
+        return float(shape_mean)
+    seconds_per_cost = float(per_cost) if per_cost is not None else THROUGHPUT_DEFAULT_SECONDS_PER_COST
+    return seconds_per_cost * estimate_render_cost(duration_seconds, segment_count)
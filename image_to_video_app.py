@@ -1,13 +1,26 @@
 import argparse
+import glob
+import os
 import subprocess
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from tempfile import TemporaryFile
+
+from common.render_profiles import DEFAULT_RENDER_PROFILE, RENDER_PROFILE_NAMES, build_encoder_args, get_render_profile
 
 MAX_DURATION_SECONDS = 600
 DEFAULT_WIDTH = 1280
 DEFAULT_HEIGHT = 720
 DEFAULT_FPS = 30
 DEFAULT_DURATION_SECONDS = 10
+ZOOM_SPEED = 0.0008
+ZOOM_MAX = 1.12
+FRAME_ENGINES = ("zoompan", "numpy")
+DEFAULT_FRAME_ENGINE = "zoompan"
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".bmp", ".webp", ".tif", ".tiff"}
 
 
 def validate_duration(duration: int) -> int:
@@ -27,10 +40,13 @@ def build_ffmpeg_command(
     width: int = DEFAULT_WIDTH,
     height: int = DEFAULT_HEIGHT,
     fps: int = DEFAULT_FPS,
+    profile: str = DEFAULT_RENDER_PROFILE,
+    threads: int | None = None,
 ) -> list[str]:
     # Gentle zoom/pan effect so a still image feels like a video sequence.
-    zoom_expr = "zoom='min(zoom+0.0008,1.12)':x='iw/2-(iw/zoom/2)':y='ih/2-(ih/zoom/2)'"
+    zoom_expr = f"zoom='min(zoom+{ZOOM_SPEED},{ZOOM_MAX})':x='iw/2-(iw/zoom/2)':y='ih/2-(ih/zoom/2)'"
     frames = duration * fps
+    threads = threads or int(get_render_profile(profile)["threads"])
     vf = (
         f"scale={width}:{height}:force_original_aspect_ratio=increase,"
         f"crop={width}:{height},"
@@ -49,22 +65,92 @@ def build_ffmpeg_command(
         "".join(vf),
         "-t",
         str(duration),
+        *build_encoder_args(profile, fps),
+        *(["-threads", str(threads)] if threads > 0 else []),
+        str(output_path),
+    ]
+
+
+def build_rawvideo_command(
+    output_path: Path,
+    duration: int,
+    width: int = DEFAULT_WIDTH,
+    height: int = DEFAULT_HEIGHT,
+    fps: int = DEFAULT_FPS,
+    profile: str = DEFAULT_RENDER_PROFILE,
+    threads: int | None = None,
+) -> list[str]:
+    # Frames arrive already zoomed and at output size on stdin, so only encoding is left to ffmpeg.
+    threads = threads or int(get_render_profile(profile)["threads"])
+    return [
+        "ffmpeg",
+        "-y",
+        "-f",
+        "rawvideo",
+        "-pix_fmt",
+        "rgb24",
+        "-s",
+        f"{width}x{height}",
         "-r",
         str(fps),
-        "-c:v",
-        "libx264",
-        "-pix_fmt",
-        "yuv420p",
+        "-i",
+        "pipe:0",
+        "-t",
+        str(duration),
+        *build_encoder_args(profile, fps),
+        *(["-threads", str(threads)] if threads > 0 else []),
         str(output_path),
     ]
 
 
-def generate_video(image_path: Path, output_path: Path, duration: int) -> None:
+def generate_video_with_synthesized_frames(
+    image_path: Path,
+    output_path: Path,
+    duration: int,
+    profile: str = DEFAULT_RENDER_PROFILE,
+    threads: int | None = None,
+) -> None:
+    # NumPy and Pillow are only needed for this engine, so the zoompan path runs without them.
+    from PIL import Image, ImageOps
+
+    from common.kenburns import feed_frames, synthesize_frames, zoom_windows
+
+    size = (DEFAULT_WIDTH, DEFAULT_HEIGHT)
+    with Image.open(image_path) as image:
+        source = ImageOps.fit(image.convert("RGB"), size, method=Image.Resampling.LANCZOS)
+    windows = zoom_windows(duration * DEFAULT_FPS, ZOOM_SPEED, ZOOM_MAX, *size)
+
+    command = build_rawvideo_command(output_path, duration, profile=profile, threads=threads)
+    with TemporaryFile() as stderr_file:
+        with subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=stderr_file) as process:
+            feed_frames(process.stdin, synthesize_frames(source, windows, size))
+            returncode = process.wait()
+        if returncode != 0:
+            stderr_file.seek(0)
+            stderr = stderr_file.read().decode("utf-8", errors="replace")
+            raise RuntimeError(
+                "ffmpeg failed. stderr:\n"
+                f"{stderr.strip() or '(no stderr output)'}"
+            )
+
+
+def generate_video(
+    image_path: Path,
+    output_path: Path,
+    duration: int,
+    profile: str = DEFAULT_RENDER_PROFILE,
+    engine: str = DEFAULT_FRAME_ENGINE,
+    threads: int | None = None,
+) -> None:
     validate_duration(duration)
     if not image_path.exists():
         raise FileNotFoundError(f"image file not found: {image_path}")
 
-    command = build_ffmpeg_command(image_path, output_path, duration)
+    if engine == "numpy":
+        generate_video_with_synthesized_frames(image_path, output_path, duration, profile=profile, threads=threads)
+        return
+
+    command = build_ffmpeg_command(image_path, output_path, duration, profile=profile, threads=threads)
     completed = subprocess.run(command, capture_output=True, text=True)
     if completed.returncode != 0:
         raise RuntimeError(
@@ -73,6 +159,124 @@ def generate_video(image_path: Path, output_path: Path, duration: int) -> None:
         )
 
 
+def _batch_output_path(image_path: Path, output_dir: Path | None) -> Path:
+    default_path = build_default_output_path(image_path)
+    return output_dir / default_path.name if output_dir else default_path
+
+
+def _expand_batch_input(source: str) -> list[Path]:
+    path = Path(source)
+    if path.is_dir():
+        return sorted(item for item in path.iterdir() if item.suffix.lower() in IMAGE_SUFFIXES)
+    if glob.has_magic(source):
+        matches = (Path(item) for item in glob.glob(source, recursive=True))
+        return sorted(item for item in matches if item.suffix.lower() in IMAGE_SUFFIXES)
+    return [path]
+
+
+def read_manifest(manifest_path: Path, default_duration: int, output_dir: Path | None) -> list[tuple[Path, Path, int]]:
+    # One render per line: image[,output[,duration]]. Blank lines and "#" comments are ignored.
+    items: list[tuple[Path, Path, int]] = []
+    for line in manifest_path.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        fields = [field.strip() for field in line.split(",")]
+        image_path = Path(fields[0])
+        output_path = Path(fields[1]) if len(fields) > 1 and fields[1] else _batch_output_path(image_path, output_dir)
+        duration = int(fields[2]) if len(fields) > 2 and fields[2] else default_duration
+        items.append((image_path, output_path, duration))
+    return items
+
+
+def collect_batch_items(
+    sources: list[str],
+    manifest_path: Path | None,
+    duration: int,
+    output_dir: Path | None,
+) -> list[tuple[Path, Path, int]]:
+    items = read_manifest(manifest_path, duration, output_dir) if manifest_path else []
+    for source in sources:
+        items.extend((image, _batch_output_path(image, output_dir), duration) for image in _expand_batch_input(source))
+    # The same image listed twice (overlapping globs) is rendered once.
+    unique: dict[Path, tuple[Path, Path, int]] = {}
+    for item in items:
+        unique.setdefault(item[1].resolve(), item)
+    return list(unique.values())
+
+
+def _partial_output_path(output_path: Path) -> Path:
+    # Keeps the real suffix last so ffmpeg still picks the container from it.
+    return output_path.with_name(f"{output_path.stem}.partial{output_path.suffix}")
+
+
+def run_batch(
+    items: list[tuple[Path, Path, int]],
+    jobs: int,
+    profile: str = DEFAULT_RENDER_PROFILE,
+    engine: str = DEFAULT_FRAME_ENGINE,
+) -> int:
+    # A finished output only ever appears through an atomic rename, so its presence means "done".
+    pending = [item for item in items if not item[1].exists()]
+    skipped = len(items) - len(pending)
+    jobs = max(1, min(jobs, len(pending) or 1))
+    # Parallel renders beat x264's own frame threading on throughput, so the cores are split evenly.
+    threads = max(1, (os.cpu_count() or 1) // jobs)
+    print(f"Batch: {len(items)} images, {skipped} already done, {len(pending)} to render with {jobs} workers")
+
+    print_lock = threading.Lock()
+    done_seconds = 0
+    failed = 0
+
+    def render(item: tuple[Path, Path, int]) -> int:
+        image_path, output_path, duration = item
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        partial_path = _partial_output_path(output_path)
+        try:
+            generate_video(image_path, partial_path, duration, profile=profile, engine=engine, threads=threads)
+        except BaseException:
+            partial_path.unlink(missing_ok=True)
+            raise
+        partial_path.replace(output_path)
+        return duration
+
+    started = time.perf_counter()
+    cpu_started = os.times()
+    with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="batch-render") as executor:
+        futures = {executor.submit(render, item): item for item in pending}
+        try:
+            for future in as_completed(futures):
+                image_path, output_path, _ = futures[future]
+                try:
+                    done_seconds += future.result()
+                except Exception as exc:  # noqa: BLE001
+                    failed += 1
+                    with print_lock:
+                        print(f"Error: {image_path}: {exc}", file=sys.stderr)
+                    continue
+                with print_lock:
+                    print(f"Created: {output_path}")
+        except KeyboardInterrupt:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+    elapsed = time.perf_counter() - started
+    cpu_finished = os.times()
+
+    rendered = len(pending) - failed
+    # os.times() only reports reaped children (ffmpeg) on POSIX; Windows leaves those fields at zero.
+    cpu_seconds = sum(
+        getattr(cpu_finished, field) - getattr(cpu_started, field)
+        for field in ("user", "system", "children_user", "children_system")
+    )
+    print(
+        f"Summary: rendered={rendered} skipped={skipped} failed={failed} wall={elapsed:.1f}s "
+        f"images/min={rendered * 60 / elapsed if elapsed > 0 else 0.0:.1f} "
+        f"cpu-sec/output-sec={cpu_seconds / done_seconds if done_seconds else 0.0:.2f}"
+        + (" (cpu excludes ffmpeg on Windows)" if os.name == "nt" else "")
+    )
+    return 1 if failed else 0
+
+
 def parse_args(argv: list[str]) -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description=(
@@ -80,7 +284,33 @@ def parse_args(argv: list[str]) -> argparse.Namespace:
             f"Duration is limited to {MAX_DURATION_SECONDS} seconds (10 minutes)."
         )
     )
-    parser.add_argument("--image", required=True, help="Path to input image")
+    parser.add_argument("--image", required=False, help="Path to input image")
+    parser.add_argument(
+        "--batch",
+        nargs="+",
+        default=[],
+        metavar="DIR_OR_GLOB",
+        help="Render every image in these directories or glob patterns (quote globs to keep the shell out)",
+    )
+    parser.add_argument(
+        "--manifest",
+        required=False,
+        default=None,
+        help="Text file with one 'image[,output[,duration]]' per line to render in batch mode",
+    )
+    parser.add_argument(
+        "--output-dir",
+        required=False,
+        default=None,
+        help="Batch mode: directory for outputs (default: next to each image)",
+    )
+    parser.add_argument(
+        "--jobs",
+        required=False,
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Batch mode: renders to run at once (default: number of CPU cores)",
+    )
     parser.add_argument(
         "--output",
         required=False,
@@ -94,17 +324,49 @@ def parse_args(argv: list[str]) -> argparse.Namespace:
         default=DEFAULT_DURATION_SECONDS,
         help=f"Video duration in seconds (1-600, default: {DEFAULT_DURATION_SECONDS})",
     )
+    parser.add_argument(
+        "--profile",
+        required=False,
+        choices=RENDER_PROFILE_NAMES,
+        default=DEFAULT_RENDER_PROFILE,
+        help=f"Encoder speed/quality profile (default: {DEFAULT_RENDER_PROFILE})",
+    )
+    parser.add_argument(
+        "--engine",
+        required=False,
+        choices=FRAME_ENGINES,
+        default=DEFAULT_FRAME_ENGINE,
+        help="How zoom frames are produced: ffmpeg's zoompan filter or NumPy synthesis piped to ffmpeg",
+    )
     return parser.parse_args(argv)
 
 
 def main(argv: list[str] | None = None) -> int:
     args = parse_args(argv or sys.argv[1:])
 
+    if args.batch or args.manifest:
+        try:
+            validate_duration(int(args.duration))
+            items = collect_batch_items(
+                args.batch,
+                Path(args.manifest) if args.manifest else None,
+                int(args.duration),
+                Path(args.output_dir) if args.output_dir else None,
+            )
+        except Exception as exc:  # noqa: BLE001
+            print(f"Error: {exc}", file=sys.stderr)
+            return 1
+        return run_batch(items, args.jobs, profile=args.profile, engine=args.engine)
+
+    if not args.image:
+        print("Error: --image, --batch or --manifest is required", file=sys.stderr)
+        return 1
+
     image_path = Path(args.image)
     output_path = Path(args.output) if args.output else build_default_output_path(image_path)
 
     try:
-        generate_video(image_path, output_path, int(args.duration))
+        generate_video(image_path, output_path, int(args.duration), profile=args.profile, engine=args.engine)
     except Exception as exc:  # noqa: BLE001
         print(f"Error: {exc}", file=sys.stderr)
         return 1
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import os
+from collections import defaultdict
+from pathlib import Path
+from typing import Any
+
+from prometheus_client import CollectorRegistry, Counter, Histogram, multiprocess, start_http_server
+from prometheus_client.mmap_dict import MmapedDict
+
+# RQ runs every job in a forked work horse, so samples only reach the exporter through
+# PROMETHEUS_MULTIPROC_DIR; it must be set before prometheus_client is first imported.
+
+# Samples of these types are plain sums, so the files of exited processes can be folded into one.
+ARCHIVED_METRIC_TYPES = ("counter", "histogram", "summary")
+
+# From a segment cache hit (tens of milliseconds) up to a full-length single-pass render.
+STAGE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0)
+
+STAGE_SECONDS = Histogram(
+    "video_stage_seconds",
+    "Wall time of one job stage.",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+STAGE_CHILD_CPU_SECONDS = Histogram(
+    "video_stage_child_cpu_seconds",
+    "CPU time (user + system) of the ffmpeg processes one job stage ran.",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+STAGE_FAILURES = Counter(
+    "video_stage_failures_total",
+    "Job stages that did not complete, by outcome (error or timeout).",
+    ["stage", "outcome"],
+)
+JOB_OUTCOMES = Counter(
+    "video_job_outcomes_total",
+    "Jobs marked succeeded or failed, by error code; failed attempts that RQ retries count too.",
+    ["status", "error_code"],
+)
+
+
+def observe_timeline(timeline: list[dict[str, Any]]) -> None:
+    for entry in timeline:
+        stage = str(entry["stage"])
+        STAGE_SECONDS.labels(stage).observe(float(entry["wall_sec"]))
+        STAGE_CHILD_CPU_SECONDS.labels(stage).observe(float(entry["child_cpu_sec"]))
+        if entry["outcome"] != "ok":
+            STAGE_FAILURES.labels(stage, str(entry["outcome"])).inc()
+
+
+def start_exporter(port: int) -> None:
+    multiproc_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if not multiproc_dir:
+        raise RuntimeError("WORKER_METRICS_PORT needs PROMETHEUS_MULTIPROC_DIR so work horse samples are exported")
+    # Files left by a previous run would be merged into this one's counters.
+    directory = Path(multiproc_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    for stale in directory.glob("*.db"):
+        stale.unlink()
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    start_http_server(port, registry=registry)
+
+
+def archive_process_metrics(pid: int) -> None:
+    # Every work horse leaves its own files behind. Folding them into this worker's archive keeps the exported
+    # totals while the directory (and every scrape) grows with live processes instead of jobs run.
+    multiproc_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if not multiproc_dir or not pid:
+        return
+    multiprocess.mark_process_dead(pid, multiproc_dir)
+    directory = Path(multiproc_dir)
+    for metric_type in ARCHIVED_METRIC_TYPES:
+        source = directory / f"{metric_type}_{pid}.db"
+        if not source.exists():
+            continue
+        # One archive per worker process, so workers sharing the directory never write the same file.
+        archive = directory / f"{metric_type}_archive-{os.getpid()}.db"
+        totals: dict[str, float] = defaultdict(float)
+        for path in (archive, source):
+            if path.exists():
+                for key, value, _, _ in MmapedDict.read_all_values_from_file(str(path)):
+                    totals[key] += value
+        # Scrapes only read *.db, so the archive is swapped in whole.
+        staging = archive.with_suffix(".tmp")
+        merged = MmapedDict(str(staging))
+        for key, value in totals.items():
+            merged.write_value(key, value, 0.0)
+        merged.close()
+        os.replace(staging, archive)
+        source.unlink()
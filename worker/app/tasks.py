@@ -1,28 +1,104 @@
 from __future__ import annotations
 
+import threading
+import time
+from datetime import datetime, timezone
 from pathlib import Path
 from tempfile import TemporaryDirectory
+from typing import Any
 
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.client import Config
 from redis import Redis
+from rq import Queue, Retry, get_current_job
+from rq.job import Job
+from rq.timeouts import JobTimeoutException
 
 from backend.models import JobStatus
-from common.config import MINIO_ACCESS_KEY, MINIO_BUCKET, MINIO_ENDPOINT, MINIO_SECRET_KEY, REDIS_URL
-from common.job_store import update_job
-from worker.pipeline import SegmentGenerationTimeoutError, generate_video_from_image
+from common.config import (
+    JOB_MAX_TIMEOUT_SECONDS,
+    MINIO_ACCESS_KEY,
+    MINIO_BUCKET,
+    MINIO_ENDPOINT,
+    MINIO_SECRET_KEY,
+    PROGRESS_PUBLISH_INTERVAL_SECONDS,
+    REDIS_URL,
+    SEGMENT_CACHE_ENABLED,
+    SEGMENT_CACHE_EVICT_INTERVAL_SECONDS,
+    SEGMENT_CACHE_MAX_AGE_SECONDS,
+    SEGMENT_CACHE_MAX_BYTES,
+    SEGMENT_CHECKPOINTS_ENABLED,
+    SEGMENT_MAX_TIMEOUT_SECONDS,
+    TRANSFER_CHUNK_SIZE_BYTES,
+    TRANSFER_MAX_CONCURRENCY,
+)
+from common.admission import release_backlog
+from common.job_store import (
+    append_job_timings,
+    get_job,
+    increment_job_field,
+    record_hls_segment,
+    update_job,
+    utc_now,
+)
+from common.render_profiles import DEFAULT_RENDER_PROFILE
+from common.scheduling import (
+    QUEUE_NAMES,
+    SHORT_QUEUE,
+    estimate_render_cost,
+    estimate_segment_count,
+    queue_for_cost,
+)
+from common.throughput import record_render_time
+from worker.app.metrics import JOB_OUTCOMES, observe_timeline
+from worker.pipeline import (
+    SEGMENT_RENDER_BUDGET_SECONDS,
+    ProgressCallback,
+    SegmentCallback,
+    SegmentGenerationTimeoutError,
+    Timeline,
+    finalize_segments,
+    generate_video_from_image,
+    file_sha256,
+    package_hls_segment,
+    plan_video,
+    prepare_source_image,
+    render_segment,
+    stage_timer,
+)
+from worker.segment_cache import SegmentCache, SegmentCheckpoints, delete_prefix
 
 redis_client = Redis.from_url(REDIS_URL)
+queues = {name: Queue(name, connection=redis_client) for name in QUEUE_NAMES}
 
 s3_client = boto3.client(
     "s3",
     endpoint_url=MINIO_ENDPOINT,
     aws_access_key_id=MINIO_ACCESS_KEY,
     aws_secret_access_key=MINIO_SECRET_KEY,
-    config=Config(signature_version="s3v4"),
+    config=Config(signature_version="s3v4", max_pool_connections=TRANSFER_MAX_CONCURRENCY * 2),
     region_name="us-east-1",
 )
 
+transfer_config = TransferConfig(
+    multipart_threshold=TRANSFER_CHUNK_SIZE_BYTES,
+    multipart_chunksize=TRANSFER_CHUNK_SIZE_BYTES,
+    max_concurrency=TRANSFER_MAX_CONCURRENCY,
+)
+
+segment_cache = (
+    SegmentCache(
+        s3_client,
+        redis_client,
+        MINIO_BUCKET,
+        max_bytes=SEGMENT_CACHE_MAX_BYTES,
+        max_age_seconds=SEGMENT_CACHE_MAX_AGE_SECONDS,
+    )
+    if SEGMENT_CACHE_ENABLED
+    else None
+)
+
 
 def _build_error_payload(exc: Exception) -> dict[str, str | bool]:
     if isinstance(exc, SegmentGenerationTimeoutError):
@@ -31,6 +107,12 @@ def _build_error_payload(exc: Exception) -> dict[str, str | bool]:
             "error_message": str(exc),
             "retryable": True,
         }
+    if isinstance(exc, JobTimeoutException):
+        return {
+            "error_code": "JOB_TIMEOUT",
+            "error_message": str(exc),
+            "retryable": True,
+        }
     return {
         "error_code": "VIDEO_GENERATION_FAILED",
         "error_message": str(exc),
@@ -38,6 +120,179 @@ def _build_error_payload(exc: Exception) -> dict[str, str | bool]:
     }
 
 
+def _mark_failed(job_id: str, exc: Exception) -> None:
+    error_payload = _build_error_payload(exc)
+    JOB_OUTCOMES.labels(JobStatus.FAILED.value, error_payload["error_code"]).inc()
+    if not _is_last_attempt():
+        # RQ queues the job again, so it stays attachable and its SSE stream open; the error is kept for display.
+        update_job(redis_client, job_id, status=JobStatus.QUEUED, **error_payload)
+        return
+    update_job(
+        redis_client,
+        job_id,
+        status=JobStatus.FAILED,
+        progress=100,
+        **error_payload,
+    )
+    # The reservation is only returned once RQ has no retries left.
+    release_backlog(redis_client, job_id)
+
+
+def _is_last_attempt() -> bool:
+    # RQ retries while retries_left is positive.
+    current_job = get_current_job()
+    return current_job is None or not current_job.retries_left
+
+
+def _job_checkpoints(job_id: str) -> SegmentCheckpoints | None:
+    # The segment cache already persists every rendered segment, so checkpoints would only duplicate it.
+    if segment_cache is not None or not SEGMENT_CHECKPOINTS_ENABLED:
+        return None
+    return SegmentCheckpoints(s3_client, MINIO_BUCKET, f"checkpoints/{job_id}/")
+
+
+def _record_render_time(job_id: str) -> None:
+    job = get_job(redis_client, job_id) or {}
+    if not job.get("started_at") or not job.get("duration_seconds"):
+        return
+    duration_seconds = int(job["duration_seconds"])
+    segment_count = int(job.get("segments_total") or estimate_segment_count(duration_seconds))
+    elapsed = (datetime.now(timezone.utc) - datetime.fromisoformat(job["started_at"])).total_seconds()
+    record_render_time(redis_client, duration_seconds, segment_count, elapsed)
+
+
+def _mark_succeeded(job_id: str, result_key: str, **fields: Any) -> None:
+    JOB_OUTCOMES.labels(JobStatus.SUCCEEDED.value, "").inc()
+    _record_render_time(job_id)
+    release_backlog(redis_client, job_id)
+    update_job(
+        redis_client,
+        job_id,
+        status=JobStatus.SUCCEEDED,
+        progress=100,
+        result_object=result_key,
+        error_code="",
+        error_message="",
+        retryable=False,
+        **fields,
+    )
+
+
+def _save_timeline(job_id: str, timeline: Timeline) -> None:
+    observe_timeline(timeline)
+    try:
+        append_job_timings(redis_client, job_id, timeline)
+    except Exception:  # noqa: BLE001
+        # Timings are diagnostics; losing them must not fail or mask the job's own outcome.
+        pass
+
+
+def _transfer_stats(direction: str, size_bytes: int, elapsed: float) -> dict[str, float | int]:
+    return {
+        f"{direction}_bytes": size_bytes,
+        f"{direction}_sec": round(elapsed, 3),
+        f"{direction}_mbps": round(size_bytes * 8 / 1_000_000 / elapsed, 2) if elapsed > 0 else 0.0,
+    }
+
+
+def _download_object(object_key: str, path: Path) -> dict[str, float | int]:
+    started = time.perf_counter()
+    s3_client.download_file(MINIO_BUCKET, object_key, str(path), Config=transfer_config)
+    return _transfer_stats("download", path.stat().st_size, time.perf_counter() - started)
+
+
+def _upload_file(path: Path, object_key: str, content_type: str = "video/mp4") -> dict[str, float | int]:
+    started = time.perf_counter()
+    s3_client.upload_file(
+        str(path),
+        MINIO_BUCKET,
+        object_key,
+        ExtraArgs={"ContentType": content_type},
+        Config=transfer_config,
+    )
+    return _transfer_stats("upload", path.stat().st_size, time.perf_counter() - started)
+
+
+def _progress_publisher(job_id: str, start: int, end: int) -> ProgressCallback:
+    lock = threading.Lock()
+    last_published = 0.0
+
+    def publish(snapshot: dict[str, Any]) -> None:
+        nonlocal last_published
+        finished = snapshot["frames_done"] >= snapshot["frames_total"]
+        with lock:
+            now = time.monotonic()
+            if not finished and now - last_published < PROGRESS_PUBLISH_INTERVAL_SECONDS:
+                return
+            last_published = now
+            fraction = snapshot["frames_done"] / max(1, snapshot["frames_total"])
+            update_job(redis_client, job_id, progress=start + int((end - start) * fraction), **snapshot)
+
+    return publish
+
+
+def _segment_prefix(job_id: str) -> str:
+    return f"segments/{job_id}/"
+
+
+def _segment_object_key(job_id: str, segment_index: int) -> str:
+    return f"{_segment_prefix(job_id)}seg_{segment_index:03d}.mp4"
+
+
+# Fixed RQ job IDs let a failing segment find the siblings and the finalize step it has to cancel.
+def _segment_rq_job_id(job_id: str, segment_index: int) -> str:
+    return f"{job_id}-segment-{segment_index:03d}"
+
+
+def _finalize_rq_job_id(job_id: str) -> str:
+    return f"{job_id}-finalize"
+
+
+def _fail_distributed_job(job_id: str, segment_count: int, exc: Exception) -> None:
+    # Earlier attempts are retried by RQ; only the last one decides the parent job's outcome.
+    if not _is_last_attempt():
+        return
+    _mark_failed(job_id, exc)
+    current_job = get_current_job()
+    pending_ids = [_segment_rq_job_id(job_id, index) for index in range(segment_count)]
+    pending_ids.append(_finalize_rq_job_id(job_id))
+    for rq_job in Job.fetch_many(pending_ids, connection=redis_client):
+        if rq_job is None or (current_job is not None and rq_job.id == current_job.id):
+            continue
+        if rq_job.get_status(refresh=False) in ("queued", "deferred", "scheduled"):
+            rq_job.cancel()
+    delete_prefix(s3_client, MINIO_BUCKET, _segment_prefix(job_id))
+
+
+def _is_abandoned(job_id: str) -> bool:
+    job = get_job(redis_client, job_id) or {}
+    return job.get("status") == JobStatus.FAILED
+
+
+def _hls_segment_object_key(job_id: str, segment_index: int) -> str:
+    return f"results/{job_id}/hls/seg_{segment_index:03d}.ts"
+
+
+def _hls_publisher(job_id: str, work_dir: Path, timeline: Timeline) -> SegmentCallback:
+    # Segments arrive in plan order, so each one starts where the previous one ended.
+    start_sec = 0.0
+
+    def publish(segment: dict[str, Any], segment_path: Path) -> None:
+        nonlocal start_sec
+        segment_index = int(segment["segment_index"])
+        duration_sec = float(segment["duration_sec"])
+        object_key = _hls_segment_object_key(job_id, segment_index)
+        with stage_timer(timeline, "hls_publish", segment_index=segment_index):
+            ts_path = package_hls_segment(segment_path, work_dir / f"hls_{segment_index:03d}.ts", start_sec)
+            _upload_file(ts_path, object_key, content_type="video/mp2t")
+            ts_path.unlink()
+        record_hls_segment(redis_client, job_id, segment_index, {"object": object_key, "duration_sec": duration_sec})
+        update_job(redis_client, job_id, hls_segments_ready=segment_index + 1)
+        start_sec += duration_sec
+
+    return publish
+
+
 def generate_video(
     job_id: str,
     source_object: str,
@@ -45,53 +300,214 @@ def generate_video(
     style: str,
     bgm_enabled: bool,
     edit_instruction: str = "",
+    render_concurrency: int | None = None,
+    render_mode: str = "local",
+    render_engine: str = "segments",
+    source_sha256: str = "",
+    render_profile: str = DEFAULT_RENDER_PROFILE,
+    frame_engine: str = "zoompan",
+    output_format: str = "mp4",
 ) -> None:
-    try:
-        update_job(redis_client, job_id, status=JobStatus.RUNNING, progress=10)
+    job = {
+        "duration_sec": duration_seconds,
+        "style": style,
+        "bgm_enabled": bgm_enabled,
+        "edit_instruction": edit_instruction,
+        "render_concurrency": render_concurrency,
+        "render_engine": render_engine,
+        "render_profile": render_profile,
+        "frame_engine": frame_engine,
+        "source_sha256": source_sha256,
+    }
+    if render_mode == "distributed":
+        _fan_out_segments(job_id, source_object, job)
+        return
 
-        source = s3_client.get_object(Bucket=MINIO_BUCKET, Key=source_object)["Body"].read()
-        update_job(redis_client, job_id, progress=30)
+    timeline: Timeline = []
+    checkpoints = _job_checkpoints(job_id)
+    try:
+        update_job(redis_client, job_id, status=JobStatus.RUNNING, progress=10, started_at=utc_now())
 
         with TemporaryDirectory() as temp_dir:
             temp_path = Path(temp_dir)
             image_path = temp_path / "source_image.jpg"
-            image_path.write_bytes(source)
+            with stage_timer(timeline, "download"):
+                transfer = _download_object(source_object, image_path)
+            update_job(redis_client, job_id, progress=30, transfer=transfer)
             output_path = temp_path / "result.mp4"
 
-            generate_video_from_image(
-                {
-                    "duration_sec": duration_seconds,
-                    "style": style,
-                    "bgm_enabled": bgm_enabled,
-                    "edit_instruction": edit_instruction,
-                    "image_path": str(image_path),
-                    "output_path": str(output_path),
-                }
+            result = generate_video_from_image(
+                {**job, "image_path": str(image_path), "output_path": str(output_path)},
+                segment_cache=segment_cache if segment_cache is not None else checkpoints,
+                progress_callback=_progress_publisher(job_id, start=30, end=60),
+                timeline=timeline,
+                segment_callback=_hls_publisher(job_id, temp_path, timeline) if output_format == "hls" else None,
             )
-            update_job(redis_client, job_id, progress=60)
-            result_bytes = output_path.read_bytes()
+            update_job(
+                redis_client,
+                job_id,
+                progress=60,
+                segments_total=len(result["segments"]),
+                render=result["render"],
+                timings=result["timings"],
+            )
+            result_key = f"results/{job_id}.mp4"
+            with stage_timer(timeline, "upload"):
+                transfer.update(_upload_file(output_path, result_key))
+
+        _mark_succeeded(job_id, result_key, transfer=transfer)
+    except Exception as exc:
+        _mark_failed(job_id, exc)
+        if checkpoints is not None and _is_last_attempt():
+            checkpoints.clear()
+        raise
+    finally:
+        _save_timeline(job_id, timeline)
 
-        result_key = f"results/{job_id}.mp4"
-        s3_client.put_object(Bucket=MINIO_BUCKET, Key=result_key, Body=result_bytes, ContentType="video/mp4")
+    if checkpoints is not None:
+        checkpoints.clear()
+    if segment_cache is not None:
+        segment_cache.evict_if_due(SEGMENT_CACHE_EVICT_INTERVAL_SECONDS)
+
+
+def _fan_out_segments(job_id: str, source_object: str, job: dict[str, Any]) -> None:
+    timeline: Timeline = []
+    try:
+        update_job(redis_client, job_id, status=JobStatus.RUNNING, progress=10, started_at=utc_now())
+        _, scene_plan = plan_video(job, timeline)
+        prepared_object = f"segments/{job_id}/source.ppm"
+        with TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            image_path = temp_path / "source_image.jpg"
+            with stage_timer(timeline, "download"):
+                _download_object(source_object, image_path)
+            # The backend already hashed the upload; only re-hash sources that predate it.
+            image_digest = job["source_sha256"] or file_sha256(image_path)
+            with stage_timer(timeline, "prepare"):
+                prepared_path = prepare_source_image(image_path, temp_path / "source.ppm")
+            with stage_timer(timeline, "upload_source"):
+                _upload_file(prepared_path, prepared_object, content_type="image/x-portable-pixmap")
 
-        update_job(redis_client, job_id, progress=90)
         update_job(
             redis_client,
             job_id,
-            status=JobStatus.SUCCEEDED,
-            progress=100,
-            result_object=result_key,
-            error_code="",
-            error_message="",
-            retryable=False,
+            progress=30,
+            render_mode="distributed",
+            segments_total=len(scene_plan),
+            segments_done=0,
         )
-    except Exception as exc:
-        error_payload = _build_error_payload(exc)
-        update_job(
-            redis_client,
+
+        segment_jobs = []
+        segment_objects: list[str] = []
+        segment_count = len(scene_plan)
+        for segment in scene_plan:
+            segment_object = _segment_object_key(job_id, segment["segment_index"])
+            segment_objects.append(segment_object)
+            segment_queue = queue_for_cost(estimate_render_cost(int(segment["duration_sec"]), segment_count=1))
+            segment_jobs.append(
+                queues[segment_queue].enqueue(
+                    "worker.app.tasks.render_video_segment",
+                    job_id,
+                    prepared_object,
+                    image_digest,
+                    segment,
+                    segment_object,
+                    segment_count,
+                    job_id=_segment_rq_job_id(job_id, segment["segment_index"]),
+                    # The retry budget plus one more timeout's worth for the download and upload.
+                    job_timeout=SEGMENT_RENDER_BUDGET_SECONDS + SEGMENT_MAX_TIMEOUT_SECONDS,
+                    retry=Retry(max=3, interval=[2, 4, 8]),
+                )
+            )
+
+        # Finalizing is a stream copy and an upload, so it never waits behind long renders.
+        queues[SHORT_QUEUE].enqueue(
+            "worker.app.tasks.finalize_video",
             job_id,
-            status=JobStatus.FAILED,
-            progress=100,
-            **error_payload,
+            segment_objects,
+            prepared_object,
+            job_id=_finalize_rq_job_id(job_id),
+            depends_on=segment_jobs,
+            job_timeout=JOB_MAX_TIMEOUT_SECONDS,
+            retry=Retry(max=3, interval=[2, 4, 8]),
         )
+    except Exception as exc:
+        _mark_failed(job_id, exc)
+        raise
+    finally:
+        _save_timeline(job_id, timeline)
+
+
+def render_video_segment(
+    job_id: str,
+    prepared_object: str,
+    image_digest: str,
+    segment: dict[str, Any],
+    segment_object: str,
+    segment_count: int,
+) -> None:
+    timeline: Timeline = []
+    segment_index = int(segment["segment_index"])
+    if _is_abandoned(job_id):
+        # A sibling segment already failed the job and removed its staged objects.
+        return
+    try:
+        with TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            prepared_path = temp_path / Path(prepared_object).name
+            with stage_timer(timeline, "download", segment_index=segment_index):
+                _download_object(prepared_object, prepared_path)
+            segment_path = temp_path / Path(segment_object).name
+            render_segment(
+                prepared_path,
+                segment,
+                segment_path,
+                segment_cache=segment_cache,
+                image_digest=image_digest,
+                timeline=timeline,
+            )
+            with stage_timer(timeline, "upload", segment_index=segment_index):
+                _upload_file(segment_path, segment_object)
+
+        if _is_abandoned(job_id):
+            # The job failed while this segment rendered; its cleanup may have run before this upload.
+            s3_client.delete_object(Bucket=MINIO_BUCKET, Key=segment_object)
+            return
+        segments_done = increment_job_field(redis_client, job_id, "segments_done")
+        update_job(redis_client, job_id, progress=30 + (30 * min(segments_done, segment_count)) // segment_count)
+    except Exception as exc:
+        _fail_distributed_job(job_id, segment_count, exc)
+        raise
+    finally:
+        _save_timeline(job_id, timeline)
+
+
+def finalize_video(job_id: str, segment_objects: list[str], prepared_object: str) -> None:
+    timeline: Timeline = []
+    try:
+        with TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            segment_paths: list[Path] = []
+            with stage_timer(timeline, "download"):
+                for segment_object in segment_objects:
+                    segment_path = temp_path / Path(segment_object).name
+                    _download_object(segment_object, segment_path)
+                    segment_paths.append(segment_path)
+
+            output_path = temp_path / "result.mp4"
+            finalize_segments(segment_paths, output_path, timeline)
+            update_job(redis_client, job_id, progress=60)
+            result_key = f"results/{job_id}.mp4"
+            with stage_timer(timeline, "upload"):
+                transfer = _upload_file(output_path, result_key)
+
+        s3_client.delete_objects(
+            Bucket=MINIO_BUCKET,
+            Delete={"Objects": [{"Key": object_key} for object_key in [*segment_objects, prepared_object]]},
+        )
+        _mark_succeeded(job_id, result_key, transfer=transfer)
+    except Exception as exc:
+        _fail_distributed_job(job_id, len(segment_objects), exc)
         raise
+    finally:
+        _save_timeline(job_id, timeline)
@@ -1,13 +1,204 @@
+from __future__ import annotations
+
+import importlib
+import math
+import os
+import random
+import time
+from datetime import datetime, timezone
+from typing import Any
+
 from redis import Redis
-from rq import Connection, Worker
+from rq import Connection, Queue, SimpleWorker, Worker
+from rq.job import Job
+from rq.utils import utcparse
+from rq.worker_pool import WorkerPool
+
+from common.config import (
+    REDIS_URL,
+    WORKER_METRICS_PORT,
+    WORKER_QUEUE_MAX_RUNNING,
+    WORKER_QUEUE_MAX_WAIT_SECONDS,
+    WORKER_QUEUE_WEIGHTS,
+    WORKER_QUEUES,
+    WORKER_SLOTS,
+)
+from common.scheduling import acquire_tier_lease, parse_queue_values, release_tier_lease
+from worker.app.metrics import archive_process_metrics, start_exporter
+
+# How often a worker whose every tier is at its cap asks for a lease again.
+TIER_LEASE_RETRY_SECONDS = 1.0
+
+
+class WeightedWorker(Worker):
+    # The queue order is chosen before every dequeue. Tiers whose oldest job has waited past its max
+    # wait go first, most overdue first; the rest follow in a weighted random order, so each tier gets
+    # roughly its weight's share of dequeues while every tier is busy. A tier with a max_running cap is
+    # only listened on while this worker holds one of its leases, which keeps the other workers for the
+    # remaining tiers even when long jobs are overdue.
+    def __init__(
+        self,
+        queues: Any,
+        *args: Any,
+        weights: dict[str, float] | None = None,
+        max_wait_seconds: dict[str, float] | None = None,
+        max_running: dict[str, float] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        self.max_running = max_running or {}
+        self._tier_leases: set[str] = set()
+        super().__init__(queues, *args, **kwargs)
+        self.weights = weights or {}
+        self.max_wait_seconds = max_wait_seconds or {}
+
+    def _head_wait_seconds(self) -> dict[str, float]:
+        watched = [queue for queue in self.queues if queue.name in self.max_wait_seconds]
+        if not watched:
+            return {}
+
+        pipe = self.connection.pipeline(transaction=False)
+        for queue in watched:
+            pipe.lindex(queue.key, 0)
+        heads = [(queue, job_id.decode()) for queue, job_id in zip(watched, pipe.execute()) if job_id]
+        if not heads:
+            return {}
+
+        for _, job_id in heads:
+            pipe.hget(Job.key_for(job_id), "enqueued_at")
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        waits: dict[str, float] = {}
+        for (queue, _), enqueued_at in zip(heads, pipe.execute()):
+            if enqueued_at:
+                waits[queue.name] = (now - utcparse(enqueued_at.decode())).total_seconds()
+        return waits
+
+    def _order_queues(self) -> list[Queue]:
+        waits = self._head_wait_seconds()
+        overdue = sorted(
+            (
+                queue
+                for queue in self.queues
+                if waits.get(queue.name, 0.0) > self.max_wait_seconds.get(queue.name, math.inf)
+            ),
+            key=lambda queue: waits[queue.name] / max(self.max_wait_seconds[queue.name], 1e-9),
+            reverse=True,
+        )
+        rest = [queue for queue in self.queues if queue not in overdue]
+        # Weighted sampling without replacement: the key random() ** (1 / weight) favours heavier tiers.
+        rest.sort(
+            key=lambda queue: random.random() ** (1.0 / max(self.weights.get(queue.name, 1.0), 1e-9)),
+            reverse=True,
+        )
+        return overdue + rest
+
+    def _leased_queues(self, queues: list[Queue], ttl: float) -> list[Queue]:
+        # Drops the capped tiers this worker cannot get (or keep) a lease on.
+        now = time.time()
+        leased = []
+        for queue in queues:
+            cap = self.max_running.get(queue.name)
+            if cap is None:
+                leased.append(queue)
+            elif acquire_tier_lease(self.connection, queue.name, self.name, int(cap), now, now + ttl):
+                self._tier_leases.add(queue.name)
+                leased.append(queue)
+            else:
+                self._tier_leases.discard(queue.name)
+        return leased
 
-from common.config import REDIS_URL
+    def _release_tier_leases(self, keep: str | None = None) -> None:
+        for queue_name in self._tier_leases - {keep}:
+            release_tier_lease(self.connection, queue_name, self.name)
+        self._tier_leases &= {keep}
+
+    def dequeue_job_and_maintain_ttl(self, timeout: int | None, max_idle_time: int | None = None) -> Any:
+        while True:
+            self._ordered_queues = self._leased_queues(self._order_queues(), self.worker_ttl + 60)
+            if self._ordered_queues or timeout is None:
+                break
+            # Every tier this worker serves is at its cap: wait for a lease instead of going idle.
+            self.heartbeat()
+            time.sleep(TIER_LEASE_RETRY_SECONDS)
+        result = super().dequeue_job_and_maintain_ttl(timeout, max_idle_time) if self._ordered_queues else None
+        if result is None:
+            self._release_tier_leases()
+            return result
+
+        job, queue = result
+        self._release_tier_leases(keep=queue.name)
+        if queue.name in self._tier_leases:
+            # Slots run jobs without heartbeats, so the lease has to outlive the job on its own.
+            job_ttl = job.timeout if job.timeout and job.timeout > 0 else self.worker_ttl
+            self._leased_queues([queue], job_ttl + 60)
+        return result
+
+    def heartbeat(self, timeout: int | None = None, pipeline: Any = None) -> None:
+        super().heartbeat(timeout, pipeline)
+        if self._tier_leases:
+            self._leased_queues(
+                [queue for queue in self.queues if queue.name in self._tier_leases], timeout or self.worker_ttl + 60
+            )
+
+    def execute_job(self, job: Job, queue: Queue) -> None:
+        try:
+            super().execute_job(job, queue)
+        finally:
+            self._release_tier_leases()
+
+    def monitor_work_horse(self, job: Job, queue: Queue) -> None:
+        horse_pid = self.horse_pid
+        super().monitor_work_horse(job, queue)
+        # The work horse has exited; its metric files would otherwise stay in the directory for good.
+        archive_process_metrics(horse_pid)
+
+    def teardown(self) -> None:
+        self._release_tier_leases()
+        super().teardown()
+
+    def reorder_queues(self, reference_queue: Queue) -> None:
+        # Ordering happens before each dequeue, where queue ages are current.
+        pass
+
+
+class SlotWorker(WeightedWorker, SimpleWorker):
+    # One of WORKER_SLOTS long-lived processes under a WorkerPool. Jobs run in this process rather than
+    # a fresh fork, so task modules, the S3 client and Redis connections are set up once per slot.
+    def __init__(self, queues: Any, *args: Any, **kwargs: Any) -> None:
+        # WorkerPool builds its workers with fixed arguments, so the tier settings are filled in here.
+        kwargs.setdefault("weights", parse_queue_values(WORKER_QUEUE_WEIGHTS))
+        kwargs.setdefault("max_wait_seconds", parse_queue_values(WORKER_QUEUE_MAX_WAIT_SECONDS))
+        kwargs.setdefault("max_running", parse_queue_values(WORKER_QUEUE_MAX_RUNNING))
+        super().__init__(queues, *args, **kwargs)
+        # Already loaded when the pool forked from run(); otherwise paid here once instead of per job.
+        importlib.import_module("worker.app.tasks")
+
+    def teardown(self) -> None:
+        super().teardown()
+        # Slots record metrics in their own process, so their files are folded in when the slot exits.
+        archive_process_metrics(os.getpid())
 
 
 def run() -> None:
+    queue_names = [name.strip() for name in WORKER_QUEUES.split(",") if name.strip()]
+    if WORKER_METRICS_PORT:
+        start_exporter(WORKER_METRICS_PORT)
     redis_client = Redis.from_url(REDIS_URL)
+    if WORKER_SLOTS > 0:
+        # Imported before the pool forks, so every slot starts warm and shares the loaded pages.
+        importlib.import_module("worker.app.tasks")
+        pool = WorkerPool(queue_names, connection=redis_client, num_workers=WORKER_SLOTS, worker_class=SlotWorker)
+        # SIGTERM or SIGINT gives every slot a warm shutdown: it finishes its current job, then exits.
+        # Slots that die on their own are replaced.
+        pool.start()
+        return
+
     with Connection(redis_client):
-        worker = Worker(["video"])
+        worker = WeightedWorker(
+            queue_names,
+            weights=parse_queue_values(WORKER_QUEUE_WEIGHTS),
+            max_wait_seconds=parse_queue_values(WORKER_QUEUE_MAX_WAIT_SECONDS),
+            max_running=parse_queue_values(WORKER_QUEUE_MAX_RUNNING),
+        )
         worker.work()
 
 
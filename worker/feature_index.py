@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import re
+import unicodedata
+from collections import defaultdict
+from functools import lru_cache
+
+FEATURE_CATALOG_SIZE = 2000
+FEATURE_GROUPS = (
+    "effect", "transition", "scene_cut", "telop", "bgm", "color", "camera", "timing", "overlay", "title"
+)
+# Japanese instructions never contain the ASCII group names, so each group is also reachable by these words.
+GROUP_ALIASES = {
+    "effect": ("エフェクト", "効果", "加工"),
+    "transition": ("トランジション", "切り替え", "切替", "つなぎ"),
+    "scene_cut": ("シーン", "カット", "場面"),
+    "telop": ("テロップ", "字幕", "文字", "キャプション"),
+    "bgm": ("音楽", "ミュージック", "曲", "サウンド"),
+    "color": ("カラー", "色", "色調", "彩度"),
+    "camera": ("カメラ", "ズーム", "パン", "手ぶれ"),
+    "timing": ("タイミング", "テンポ", "リズム", "尺"),
+    "overlay": ("オーバーレイ", "重ね", "合成"),
+    "title": ("タイトル", "見出し", "表題"),
+}
+
+_CJK_RUN = re.compile(r"[^\x00-\x7f\s、。，．・「」『』（）！？]+")
+
+
+def build_feature_catalog(size: int = FEATURE_CATALOG_SIZE) -> list[str]:
+    return [f"{FEATURE_GROUPS[index % len(FEATURE_GROUPS)]}_{index + 1:04d}" for index in range(size)]
+
+
+def normalize_instruction(instruction: str) -> str:
+    return (instruction or "").strip().lower()
+
+
+def instruction_keys(normalized: str) -> list[str]:
+    # Keys are split exactly as the pipeline always has, so ASCII instructions keep their selections.
+    return [token for token in normalized.replace("、", " ").replace(",", " ").split() if token]
+
+
+def _bitsets(members: dict[object, list[int]], size: int) -> dict[object, int]:
+    bitsets = {}
+    for key, ranks in members.items():
+        buffer = bytearray((size + 7) // 8)
+        for rank in ranks:
+            buffer[rank >> 3] |= 1 << (rank & 7)
+        bitsets[key] = int.from_bytes(buffer, "little")
+    return bitsets
+
+
+class FeatureIndex:
+    # Features are numbered by (name, catalog position), the order ties are broken in, and every set of features
+    # is an int bitset over those ranks. A lookup is then a fixed number of word-parallel bitset operations per
+    # key and per selected feature, however large the catalog is.
+    def __init__(self, catalog: list[str], cache_size: int = 4096) -> None:
+        self.catalog = catalog
+        self._by_rank = sorted(range(len(catalog)), key=lambda position: (catalog[position], position))
+        self._max_length = max((len(feature) for feature in catalog), default=0)
+
+        # Bit r of (char, offset) is set when feature r has char at offset, which answers substring queries exactly.
+        positional: dict[object, list[int]] = defaultdict(list)
+        groups: dict[object, list[int]] = defaultdict(list)
+        for rank, position in enumerate(self._by_rank):
+            feature = catalog[position]
+            for offset, char in enumerate(feature):
+                positional[(char, offset)].append(rank)
+            groups[feature.rsplit("_", 1)[0]].append(rank)
+        self._positional = _bitsets(positional, len(catalog))
+        group_bits = _bitsets(groups, len(catalog))
+        self._aliases = [
+            (alias, group_bits.get(group, 0)) for group, aliases in GROUP_ALIASES.items() for alias in aliases
+        ]
+
+        self._select_cached = lru_cache(maxsize=cache_size)(self._select_normalized) if cache_size else None
+
+    def _features_containing(self, key: str) -> int:
+        found = 0
+        for start in range(self._max_length - len(key) + 1):
+            matches = -1
+            for offset, char in enumerate(key, start):
+                matches &= self._positional.get((char, offset), 0)
+                if not matches:
+                    break
+            found |= matches
+        return found
+
+    def _select_normalized(self, normalized: str, limit: int) -> tuple[str, ...]:
+        if not normalized:
+            return tuple(self.catalog[:limit])
+
+        keys = instruction_keys(normalized)
+        weighted: list[tuple[int, int]] = [(self._features_containing(key), len(key)) for key in keys]
+        for run in _CJK_RUN.findall(unicodedata.normalize("NFKC", normalized)):
+            weighted.extend((members, len(alias)) for alias, members in self._aliases if alias in run)
+
+        # Scores are kept bit-sliced: bit b of a feature's score is its bit in score_bits[b].
+        score_bits: list[int] = []
+        for members, weight in weighted:
+            for bit in range(weight.bit_length()):
+                carry = members if weight >> bit & 1 else 0
+                position = bit
+                while carry:
+                    if position >= len(score_bits):
+                        score_bits.extend([0] * (position + 1 - len(score_bits)))
+                    score_bits[position], carry = score_bits[position] ^ carry, score_bits[position] & carry
+                    position += 1
+
+        remaining = 0
+        for bits in score_bits:
+            remaining |= bits
+        selected: list[str] = []
+        while remaining and len(selected) < limit:
+            best = remaining
+            for bits in reversed(score_bits):
+                if best & bits:
+                    best &= bits
+            while best and len(selected) < limit:
+                lowest = best & -best
+                selected.append(self.catalog[self._by_rank[lowest.bit_length() - 1]])
+                best ^= lowest
+                remaining ^= lowest
+        if len(selected) < limit:
+            selected.extend(self.catalog[: limit - len(selected)])
+        return tuple(selected)
+
+    def select(self, instruction: str, limit: int = 16) -> list[str]:
+        normalized = normalize_instruction(instruction)
+        if self._select_cached is not None:
+            return list(self._select_cached(normalized, limit))
+        return list(self._select_normalized(normalized, limit))
+
+
+FEATURE_CATALOG = build_feature_catalog()
+DEFAULT_FEATURE_INDEX = FeatureIndex(FEATURE_CATALOG)
@@ -1,36 +1,276 @@
 from __future__ import annotations
 
+import hashlib
 import math
+import os
 import random
 import subprocess
+import threading
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from tempfile import TemporaryFile
+from typing import TYPE_CHECKING, Any
 
-from common.config import SEGMENT_MAX_TIMEOUT_SECONDS
+from PIL import Image, ImageOps
+
+from common.config import (
+    FFMPEG_THREADS,
+    SEGMENT_MAX_TIMEOUT_SECONDS,
+    SEGMENT_RENDER_CONCURRENCY,
+    SEGMENT_RETRY_ATTEMPTS,
+    WORKER_SLOTS,
+)
+from common.kenburns import feed_frames, rawvideo_input_args, synthesize_frames, zoom_windows
+from common.render_profiles import DEFAULT_RENDER_PROFILE, build_encoder_args, get_render_profile
+from worker.feature_index import DEFAULT_FEATURE_INDEX, FEATURE_CATALOG_SIZE
+
+if TYPE_CHECKING:
+    from worker.segment_cache import SegmentCache, SegmentCheckpoints
+
+    SegmentStore = SegmentCache | SegmentCheckpoints
 
 MAX_DURATION_SECONDS = 600
 MIN_DURATION_SECONDS = 1
 SEGMENT_MIN_SECONDS = 20
 SEGMENT_MAX_SECONDS = 60
-FEATURE_CATALOG_SIZE = 2000
+OUTPUT_WIDTH = 1280
+OUTPUT_HEIGHT = 720
+OUTPUT_FPS = 30
+ZOOM_MAX = 1.12
+# Source pixels kept per job: the output size plus room for the deepest zoompan step.
+WORKING_WIDTH = 2 * round(OUTPUT_WIDTH * ZOOM_MAX / 2)
+WORKING_HEIGHT = 2 * round(OUTPUT_HEIGHT * ZOOM_MAX / 2)
+RENDER_ENGINES = ("segments", "single_pass")
+# How the zoom/pan frames are produced: ffmpeg's zoompan filter, or synthesized in-process and piped.
+FRAME_ENGINES = ("zoompan", "numpy")
+
+
+ProgressCallback = Callable[[dict[str, Any]], None]
+# Called with each segment plan and its rendered file, in plan order, while later segments still render.
+SegmentCallback = Callable[[dict[str, Any], Path], None]
+# Per-job list of stage records, appended to as stages finish (including the one that failed).
+Timeline = list[dict[str, Any]]
+# CPU seconds of the ffmpeg children each thread has reaped; concurrent segment renders run on their own threads.
+_child_usage = threading.local()
 
 
 class SegmentGenerationTimeoutError(TimeoutError):
     pass
 
 
-def _run_command(command: list[str], timeout_seconds: int | None = None) -> None:
+class RenderCancelledError(RuntimeError):
+    pass
+
+
+class RenderCancellation:
+    # Shared by the segments of one render: once one fails for good, cancel() kills the ffmpeg children
+    # still running so the render fails now instead of after every in-flight encode has finished.
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._processes: set[subprocess.Popen[bytes]] = set()
+        self._cancelled = False
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def cancel(self) -> None:
+        with self._lock:
+            self._cancelled = True
+            processes = tuple(self._processes)
+        for process in processes:
+            process.kill()
+
+    def register(self, process: subprocess.Popen[bytes]) -> None:
+        with self._lock:
+            self._processes.add(process)
+            cancelled = self._cancelled
+        if cancelled:
+            process.kill()
+
+    def unregister(self, process: subprocess.Popen[bytes]) -> None:
+        with self._lock:
+            self._processes.discard(process)
+
+
+# Encoder failures worth another attempt; anything else (bad input, a broken frame feed) fails at once.
+RETRYABLE_SEGMENT_ERRORS = (SegmentGenerationTimeoutError, subprocess.CalledProcessError)
+# How _render_or_fetch_segment produced each segment.
+CACHED_OUTCOMES = frozenset({"cached", "cached_fallback"})
+FALLBACK_OUTCOMES = frozenset({"fallback", "cached_fallback"})
+# Longest one segment can spend in the encoder, counting every fallback attempt.
+SEGMENT_RENDER_BUDGET_SECONDS = SEGMENT_MAX_TIMEOUT_SECONDS * (SEGMENT_RETRY_ATTEMPTS + 1)
+
+
+class _RenderProgress:
+    # Folds the per-process "-progress" reports of concurrent encodes into one job-level snapshot.
+    def __init__(self, frames_total: int, callback: ProgressCallback) -> None:
+        self._frames_total = frames_total
+        self._callback = callback
+        self._lock = threading.Lock()
+        self._streams: dict[int, tuple[int, float, float]] = {}
+
+    def _publish(self, key: int, frames: int, fps: float, speed: float) -> None:
+        with self._lock:
+            self._streams[key] = (frames, fps, speed)
+            snapshot = {
+                "frames_done": min(sum(frames for frames, _, _ in self._streams.values()), self._frames_total),
+                "frames_total": self._frames_total,
+                "encode_fps": round(sum(fps for _, fps, _ in self._streams.values()), 2),
+                "speed": round(sum(speed for _, _, speed in self._streams.values()), 3),
+            }
+        self._callback(snapshot)
+
+    def stream_callback(self, key: int) -> ProgressCallback:
+        def report(update: dict[str, Any]) -> None:
+            if update.get("progress") == "end":
+                self._publish(key, _parse_number(update.get("frame"), int), 0.0, 0.0)
+                return
+            self._publish(
+                key,
+                _parse_number(update.get("frame"), int),
+                _parse_number(update.get("fps"), float),
+                _parse_number(str(update.get("speed", "")).rstrip("x"), float),
+            )
+
+        return report
+
+    def complete(self, key: int, frames: int) -> None:
+        self._publish(key, frames, 0.0, 0.0)
+
+
+def _parse_number(raw: Any, cast: Callable[[str], Any]) -> Any:
     try:
-        subprocess.run(
-            command,
-            check=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            timeout=timeout_seconds,
+        return cast(str(raw).strip())
+    except ValueError:
+        return cast("0")
+
+
+def _child_cpu_seconds() -> float:
+    return getattr(_child_usage, "cpu_seconds", 0.0)
+
+
+def _wait_for_child(process: subprocess.Popen[bytes]) -> int:
+    # wait4 reports this child's own CPU time; RUSAGE_CHILDREN would mix in encodes on other threads.
+    if not hasattr(os, "wait4"):
+        return process.wait()
+    try:
+        _, status, usage = os.wait4(process.pid, 0)
+    except ChildProcessError:
+        # Already reaped by a timeout kill(); the exit code survives, its CPU time does not.
+        return process.wait()
+    process.returncode = os.waitstatus_to_exitcode(status)
+    _child_usage.cpu_seconds = _child_cpu_seconds() + usage.ru_utime + usage.ru_stime
+    return process.returncode
+
+
+@contextmanager
+def stage_timer(timeline: Timeline | None, stage: str, **fields: Any) -> Iterator[None]:
+    if timeline is None:
+        yield
+        return
+    started_at = datetime.now(timezone.utc).isoformat()
+    started = time.perf_counter()
+    cpu_started = _child_cpu_seconds()
+    outcome = "ok"
+    try:
+        yield
+    except TimeoutError:
+        outcome = "timeout"
+        raise
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        timeline.append(
+            {
+                "stage": stage,
+                **fields,
+                "started_at": started_at,
+                "wall_sec": round(time.perf_counter() - started, 3),
+                "child_cpu_sec": round(_child_cpu_seconds() - cpu_started, 3),
+                "outcome": outcome,
+            }
         )
-    except subprocess.TimeoutExpired as exc:
-        raise SegmentGenerationTimeoutError(f"Command timed out after {timeout_seconds}s: {' '.join(command)}") from exc
+
+
+def _run_command(
+    command: list[str],
+    timeout_seconds: int | None = None,
+    progress_callback: ProgressCallback | None = None,
+    stdin_frames: Iterator[bytes] | None = None,
+    cancellation: RenderCancellation | None = None,
+) -> None:
+    if cancellation is not None and cancellation.cancelled:
+        raise RenderCancelledError(f"Render cancelled before: {' '.join(command)}")
+    if progress_callback is not None:
+        command = [command[0], "-progress", "pipe:1", "-nostats", *command[1:]]
+    timed_out = threading.Event()
+    feed_errors: list[BaseException] = []
+    with TemporaryFile() as stderr_file:
+        with subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE if stdin_frames is not None else None,
+            stdout=subprocess.PIPE if progress_callback is not None else subprocess.DEVNULL,
+            stderr=stderr_file,
+        ) as process:
+
+            def kill_on_timeout() -> None:
+                timed_out.set()
+                process.kill()
+
+            def feed() -> None:
+                try:
+                    feed_frames(process.stdin, stdin_frames)
+                except BaseException as exc:  # noqa: BLE001
+                    feed_errors.append(exc)
+                    process.kill()
+
+            if cancellation is not None:
+                cancellation.register(process)
+            # Frames go in on their own thread so a full stdout pipe can never stall the writer.
+            feeder = threading.Thread(target=feed, daemon=True) if stdin_frames is not None else None
+            if feeder is not None:
+                feeder.start()
+            timer = threading.Timer(timeout_seconds, kill_on_timeout) if timeout_seconds else None
+            if timer is not None:
+                timer.start()
+            try:
+                update: dict[str, str] = {}
+                for raw_line in process.stdout or []:
+                    key, _, value = raw_line.decode("utf-8", errors="replace").strip().partition("=")
+                    if not key:
+                        continue
+                    update[key] = value.strip()
+                    # ffmpeg terminates every key=value block with a progress=continue|end line.
+                    if key == "progress" and progress_callback is not None:
+                        progress_callback(update)
+                        update = {}
+                returncode = _wait_for_child(process)
+            finally:
+                if timer is not None:
+                    timer.cancel()
+                if process.poll() is None:
+                    process.kill()
+                if feeder is not None:
+                    feeder.join()
+                if cancellation is not None:
+                    cancellation.unregister(process)
+
+        if cancellation is not None and cancellation.cancelled:
+            raise RenderCancelledError(f"Render cancelled: {' '.join(command)}")
+        if timed_out.is_set():
+            raise SegmentGenerationTimeoutError(f"Command timed out after {timeout_seconds}s: {' '.join(command)}")
+        if feed_errors:
+            raise feed_errors[0]
+        if returncode != 0:
+            stderr_file.seek(0)
+            stderr = stderr_file.read().decode("utf-8", errors="replace")
+            raise subprocess.CalledProcessError(returncode, command, stderr=stderr)
 
 
 def _probe_duration(video_path: Path) -> float:
@@ -77,39 +317,13 @@ def _calculate_segment_durations(duration_sec: int) -> list[int]:
     raise ValueError(f"Unable to split duration {duration_sec} into valid segments")
 
 
-def _build_feature_catalog() -> list[str]:
-    groups = [
-        "effect", "transition", "scene_cut", "telop", "bgm", "color", "camera", "timing", "overlay", "title"
-    ]
-    return [f"{groups[index % len(groups)]}_{index + 1:04d}" for index in range(FEATURE_CATALOG_SIZE)]
-
-
-def _select_features_from_instruction(instruction: str, catalog: list[str], limit: int = 16) -> list[str]:
-    normalized = (instruction or "").strip().lower()
-    if not normalized:
-        return catalog[:limit]
-
-    keys = [token for token in normalized.replace("、", " ").replace(",", " ").split() if token]
-    weighted: list[tuple[int, str]] = []
-    for feature in catalog:
-        score = 0
-        for key in keys:
-            if key in feature:
-                score += len(key)
-        if score > 0:
-            weighted.append((score, feature))
-
-    weighted.sort(key=lambda row: (-row[0], row[1]))
-    selected = [feature for _, feature in weighted[:limit]]
-    if len(selected) < limit:
-        selected.extend(catalog[: limit - len(selected)])
-    return selected
+def _select_features_from_instruction(instruction: str, limit: int = 16) -> list[str]:
+    return DEFAULT_FEATURE_INDEX.select(instruction, limit)
 
 
 def _analyze_image(job: dict[str, Any]) -> dict[str, Any]:
-    catalog = _build_feature_catalog()
     instruction = str(job.get("edit_instruction", ""))
-    selected_features = _select_features_from_instruction(instruction, catalog)
+    selected_features = _select_features_from_instruction(instruction)
 
     return {
         "subject": str(job.get("subject", "main subject")),
@@ -128,6 +342,11 @@ def _build_scene_plan(job: dict[str, Any], analysis: dict[str, Any]) -> list[dic
     seed = int(job.get("seed", random.randint(1, 2_147_483_647)))
     camera_motion = str(job.get("camera_motion", "slow_push_in"))
     subject_lock = bool(job.get("subject_lock", True))
+    render_profile = str(job.get("render_profile") or DEFAULT_RENDER_PROFILE)
+    get_render_profile(render_profile)
+    frame_engine = str(job.get("frame_engine") or "zoompan")
+    if frame_engine not in FRAME_ENGINES:
+        raise ValueError(f"frame_engine must be one of {', '.join(FRAME_ENGINES)}")
 
     scenes: list[dict[str, Any]] = []
     for index, segment_duration in enumerate(segment_durations):
@@ -139,23 +358,24 @@ def _build_scene_plan(job: dict[str, Any], analysis: dict[str, Any]) -> list[dic
                 "seed": seed,
                 "camera_motion": camera_motion,
                 "subject_lock": subject_lock,
+                "render_profile": render_profile,
+                "frame_engine": frame_engine,
                 "feature": analysis["selected_features"][index % len(analysis["selected_features"])],
             }
         )
     return scenes
 
 
-def _build_filter_chain(segment_plan: dict[str, Any]) -> str:
+def _zoom_speed(segment_plan: dict[str, Any]) -> float:
+    return round(0.0006 + (int(segment_plan["segment_index"]) % 5) * 0.0001, 4)
+
+
+def _build_look_chain(segment_plan: dict[str, Any]) -> str:
     idx = int(segment_plan["segment_index"])
-    zoom_speed = 0.0006 + (idx % 5) * 0.0001
     sat = 1.00 + (idx % 4) * 0.04
     contrast = 1.00 + (idx % 3) * 0.03
     noise_level = 2 + (idx % 5)
-
     return (
-        "scale=1280:720:force_original_aspect_ratio=increase,"
-        "crop=1280:720,"
-        f"zoompan=z='min(zoom+{zoom_speed:.4f},1.12)':x='iw/2-(iw/zoom/2)':y='ih/2-(ih/zoom/2)':d=1:s=1280x720:fps=30,"
         f"eq=contrast={contrast:.2f}:saturation={sat:.2f},"
         "unsharp=5:5:0.6:5:5:0.0,"
         f"noise=alls={noise_level}:allf=t,"
@@ -163,31 +383,311 @@ def _build_filter_chain(segment_plan: dict[str, Any]) -> str:
     )
 
 
-def _render_segment(image_path: Path, segment_plan: dict[str, Any], segment_path: Path) -> None:
+def _build_filter_chain(segment_plan: dict[str, Any]) -> str:
+    # The scale/crop pair is a no-op on a prepared source and only does work on raw uploads.
+    return (
+        f"scale={WORKING_WIDTH}:{WORKING_HEIGHT}:force_original_aspect_ratio=increase,"
+        f"crop={WORKING_WIDTH}:{WORKING_HEIGHT},"
+        f"zoompan=z='min(zoom+{_zoom_speed(segment_plan):.4f},{ZOOM_MAX:.2f})'"
+        f":x='iw/2-(iw/zoom/2)':y='ih/2-(ih/zoom/2)':d=1:s={OUTPUT_WIDTH}x{OUTPUT_HEIGHT}:fps={OUTPUT_FPS},"
+        f"{_build_look_chain(segment_plan)}"
+    )
+
+
+def _synthesize_segment_frames(image_path: Path, segment_plan: dict[str, Any]) -> Iterator[bytes]:
+    with Image.open(image_path) as image:
+        # Fitting is a no-op on a prepared source and only does work on raw uploads.
+        source = ImageOps.fit(image.convert("RGB"), (WORKING_WIDTH, WORKING_HEIGHT), method=Image.Resampling.LANCZOS)
+    windows = zoom_windows(_segment_frame_count(segment_plan), _zoom_speed(segment_plan), ZOOM_MAX, *source.size)
+    return synthesize_frames(source, windows, (OUTPUT_WIDTH, OUTPUT_HEIGHT))
+
+
+def prepare_source_image(image_path: Path, prepared_path: Path) -> Path:
+    with Image.open(image_path) as image:
+        # Let the JPEG decoder skip resolution we would throw away; either orientation must still cover the frame.
+        image.draft("RGB", (max(WORKING_WIDTH, WORKING_HEIGHT), max(WORKING_WIDTH, WORKING_HEIGHT)))
+        oriented = ImageOps.exif_transpose(image).convert("RGB")
+    fitted = ImageOps.fit(oriented, (WORKING_WIDTH, WORKING_HEIGHT), method=Image.Resampling.LANCZOS)
+    # PPM keeps the per-frame decode behind "-loop 1" down to a memcpy.
+    fitted.save(prepared_path, format="PPM")
+    return prepared_path
+
+
+def _plan_frame_engine(segment_plan: dict[str, Any]) -> str:
+    return str(segment_plan.get("frame_engine") or "zoompan")
+
+
+def _plan_render_profile(segment_plan: dict[str, Any]) -> str:
+    # Plans queued before profiles existed carry no name and render as before the change.
+    return str(segment_plan.get("render_profile") or DEFAULT_RENDER_PROFILE)
+
+
+def _job_cores() -> int:
+    # The whole host, or this slot's even share of it when several jobs run side by side.
+    return max(1, (os.cpu_count() or 1) // max(1, WORKER_SLOTS))
+
+
+def _resolve_ffmpeg_threads(job: dict[str, Any], profile_name: str, concurrency: int = 1) -> int:
+    threads = int(job.get("ffmpeg_threads") or FFMPEG_THREADS or get_render_profile(profile_name)["threads"])
+    if threads <= 0 and (concurrency > 1 or WORKER_SLOTS > 1):
+        # Split this job's cores between its concurrent encodes instead of letting each one claim the host.
+        threads = max(1, _job_cores() // concurrency)
+    return threads
+
+
+def _resolve_render_parallelism(job: dict[str, Any], scene_plan: list[dict[str, Any]]) -> tuple[int, int]:
+    concurrency = int(job.get("render_concurrency") or SEGMENT_RENDER_CONCURRENCY)
+    concurrency = max(1, min(concurrency, len(scene_plan)))
+    return concurrency, _resolve_ffmpeg_threads(job, _plan_render_profile(scene_plan[0]), concurrency)
+
+
+def _encoder_args(profile_name: str, fallback: bool = False) -> list[str]:
+    return build_encoder_args(profile_name, OUTPUT_FPS, fallback)
+
+
+def _plan_encoder_args(segment_plan: dict[str, Any]) -> list[str]:
+    return _encoder_args(_plan_render_profile(segment_plan), bool(segment_plan.get("encoder_fallback")))
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _segment_cache_key(image_digest: str, segment_plan: dict[str, Any]) -> str:
+    # Everything that reaches the encoder: source pixels, filter chain, duration and encoder settings.
+    material = "\n".join(
+        [
+            image_digest,
+            _plan_frame_engine(segment_plan),
+            _build_filter_chain(segment_plan),
+            str(segment_plan["duration_sec"]),
+            " ".join(_plan_encoder_args(segment_plan)),
+        ]
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def _segment_frame_count(segment_plan: dict[str, Any]) -> int:
+    return int(segment_plan["duration_sec"]) * OUTPUT_FPS
+
+
+def _render_segment(
+    image_path: Path,
+    segment_plan: dict[str, Any],
+    segment_path: Path,
+    threads: int = 0,
+    progress_callback: ProgressCallback | None = None,
+    cancellation: RenderCancellation | None = None,
+) -> None:
+    stdin_frames = None
+    if _plan_frame_engine(segment_plan) == "numpy":
+        stdin_frames = _synthesize_segment_frames(image_path, segment_plan)
+        input_args = rawvideo_input_args(OUTPUT_WIDTH, OUTPUT_HEIGHT, OUTPUT_FPS)
+        video_filter = _build_look_chain(segment_plan)
+    else:
+        input_args = ["-loop", "1", "-i", str(image_path)]
+        video_filter = _build_filter_chain(segment_plan)
+
     _run_command(
         [
             "ffmpeg",
             "-y",
-            "-loop",
-            "1",
-            "-i",
-            str(image_path),
+            *input_args,
             "-t",
             str(segment_plan["duration_sec"]),
             "-vf",
-            _build_filter_chain(segment_plan),
-            "-r",
-            "30",
-            "-c:v",
-            "libx264",
-            "-pix_fmt",
-            "yuv420p",
+            video_filter,
+            *_plan_encoder_args(segment_plan),
+            *(["-threads", str(threads)] if threads > 0 else []),
             str(segment_path),
         ],
         timeout_seconds=SEGMENT_MAX_TIMEOUT_SECONDS,
+        progress_callback=progress_callback,
+        stdin_frames=stdin_frames,
+        cancellation=cancellation,
     )
 
 
+def _render_segment_with_retry(
+    image_path: Path,
+    segment_plan: dict[str, Any],
+    segment_path: Path,
+    threads: int,
+    progress_callback: ProgressCallback | None = None,
+    timeline: Timeline | None = None,
+    cancellation: RenderCancellation | None = None,
+) -> dict[str, Any]:
+    # Returns the plan the segment was finally rendered with.
+    segment_index = int(segment_plan["segment_index"])
+    plan = segment_plan
+    attempt = 1
+    while True:
+        try:
+            with stage_timer(
+                timeline,
+                "render_segment",
+                segment_index=segment_index,
+                attempt=attempt,
+                fallback=bool(plan.get("encoder_fallback")),
+            ):
+                _render_segment(image_path, plan, segment_path, threads, progress_callback, cancellation)
+            return plan
+        except RETRYABLE_SEGMENT_ERRORS:
+            if attempt > SEGMENT_RETRY_ATTEMPTS:
+                raise
+        attempt += 1
+        plan = {**segment_plan, "encoder_fallback": True}
+
+
+def _render_or_fetch_segment(
+    image_path: Path,
+    segment_plan: dict[str, Any],
+    segment_path: Path,
+    threads: int,
+    segment_cache: SegmentStore | None,
+    image_digest: str,
+    progress: _RenderProgress | None = None,
+    timeline: Timeline | None = None,
+    cancellation: RenderCancellation | None = None,
+) -> str:
+    # One of SEGMENT_OUTCOMES; the fallback ones mean only the fast fallback encode succeeded.
+    segment_index = int(segment_plan["segment_index"])
+    progress_callback = progress.stream_callback(segment_index) if progress is not None else None
+    if segment_cache is not None:
+        candidates = [("cached", _segment_cache_key(image_digest, segment_plan))]
+        if segment_cache.keeps_fallbacks:
+            # A retry of the same job still prefers its earlier fallback encode to rendering the segment again.
+            fallback_key = _segment_cache_key(image_digest, {**segment_plan, "encoder_fallback": True})
+            if fallback_key != candidates[0][1]:
+                candidates.append(("cached_fallback", fallback_key))
+        for outcome, cache_key in candidates:
+            with stage_timer(timeline, "segment_cache_fetch", segment_index=segment_index):
+                cache_hit = segment_cache.fetch(cache_key, segment_path)
+            if cache_hit:
+                if progress is not None:
+                    progress.complete(segment_index, _segment_frame_count(segment_plan))
+                return outcome
+
+    rendered_plan = _render_segment_with_retry(
+        image_path, segment_plan, segment_path, threads, progress_callback, timeline, cancellation
+    )
+    fallback = bool(rendered_plan.get("encoder_fallback"))
+    if segment_cache is not None and (segment_cache.keeps_fallbacks or not fallback):
+        # Keyed by the settings actually used, so a full encode is always preferred over a fallback one.
+        segment_cache.store(_segment_cache_key(image_digest, rendered_plan), segment_path)
+    return "fallback" if fallback else "rendered"
+
+
+def _render_segments(
+    image_path: Path,
+    scene_plan: list[dict[str, Any]],
+    segment_paths: list[Path],
+    concurrency: int,
+    threads: int,
+    segment_cache: SegmentStore | None = None,
+    image_digest: str = "",
+    progress: _RenderProgress | None = None,
+    timeline: Timeline | None = None,
+    segment_callback: SegmentCallback | None = None,
+) -> list[str]:
+    if concurrency <= 1:
+        outcomes = []
+        for segment, segment_path in zip(scene_plan, segment_paths):
+            outcomes.append(
+                _render_or_fetch_segment(
+                    image_path, segment, segment_path, threads, segment_cache, image_digest, progress, timeline
+                )
+            )
+            if segment_callback is not None:
+                segment_callback(segment, segment_path)
+        return outcomes
+
+    cancellation = RenderCancellation()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="segment-render") as executor:
+        futures = [
+            executor.submit(
+                _render_or_fetch_segment,
+                image_path,
+                segment,
+                segment_path,
+                threads,
+                segment_cache,
+                image_digest,
+                progress,
+                timeline,
+                cancellation,
+            )
+            for segment, segment_path in zip(scene_plan, segment_paths)
+        ]
+        try:
+            outcomes = []
+            pending = set(futures)
+            # Waiting in plan order hands segments to the callback as soon as every earlier one is done,
+            # while a failure of any later segment still surfaces the moment it happens.
+            for segment, segment_path, future in zip(scene_plan, segment_paths, futures):
+                while not future.done():
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for finished in done:
+                        finished.result()
+                outcomes.append(future.result())
+                if segment_callback is not None:
+                    segment_callback(segment, segment_path)
+            return outcomes
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            # Leaving the executor waits for running segments; killing their encoders makes that immediate.
+            cancellation.cancel()
+            raise
+
+
+def _render_single_pass(
+    image_path: Path,
+    scene_plan: list[dict[str, Any]],
+    output_path: Path,
+    threads: int = 0,
+    progress: _RenderProgress | None = None,
+) -> float:
+    # One looped input per segment so each keeps its own zoompan state, joined by the concat filter
+    # and muxed straight into the final file; "-t" makes the duration exact without a trim pass.
+    # zoompan with d=1 emits one frame per input frame, so the loop must run at the output rate, not
+    # image2's default 25 fps, or every segment comes out short.
+    inputs: list[str] = []
+    filters: list[str] = []
+    for index, segment in enumerate(scene_plan):
+        inputs.extend(
+            ["-framerate", str(OUTPUT_FPS), "-loop", "1", "-t", str(segment["duration_sec"]), "-i", str(image_path)]
+        )
+        filters.append(f"[{index}:v]{_build_filter_chain(segment)}[v{index}]")
+    stream_labels = "".join(f"[v{index}]" for index in range(len(scene_plan)))
+    filters.append(f"{stream_labels}concat=n={len(scene_plan)}:v=1:a=0[out]")
+    total_duration = float(min(sum(int(segment["duration_sec"]) for segment in scene_plan), MAX_DURATION_SECONDS))
+
+    _run_command(
+        [
+            "ffmpeg",
+            "-y",
+            *inputs,
+            "-filter_complex",
+            ";".join(filters),
+            "-map",
+            "[out]",
+            "-t",
+            f"{total_duration:.3f}",
+            *_encoder_args(_plan_render_profile(scene_plan[0])),
+            *(["-threads", str(threads)] if threads > 0 else []),
+            str(output_path),
+        ],
+        timeout_seconds=SEGMENT_MAX_TIMEOUT_SECONDS * len(scene_plan),
+        progress_callback=progress.stream_callback(0) if progress is not None else None,
+    )
+    return total_duration
+
+
 def _concat_segments(segment_paths: list[Path], concat_list_path: Path, output_path: Path) -> None:
     concat_list_path.write_text("".join(f"file '{path.as_posix()}'\n" for path in segment_paths), encoding="utf-8")
     _run_command(
@@ -207,10 +707,31 @@ def _concat_segments(segment_paths: list[Path], concat_list_path: Path, output_p
     )
 
 
-def _trim_if_exceeds_limit(video_path: Path, max_duration_sec: float) -> None:
+def package_hls_segment(segment_path: Path, output_path: Path, start_sec: float) -> Path:
+    # MPEG-TS carries the parameter sets in-band, so every segment plays on its own without a shared
+    # init segment; the offset keeps timestamps continuous across the playlist.
+    _run_command(
+        [
+            "ffmpeg",
+            "-y",
+            "-i",
+            str(segment_path),
+            "-c",
+            "copy",
+            "-output_ts_offset",
+            f"{start_sec:.3f}",
+            "-f",
+            "mpegts",
+            str(output_path),
+        ]
+    )
+    return output_path
+
+
+def _trim_if_exceeds_limit(video_path: Path, max_duration_sec: float) -> float:
     actual_duration = _probe_duration(video_path)
     if actual_duration <= max_duration_sec:
-        return
+        return actual_duration
 
     trimmed_path = video_path.with_name(f"{video_path.stem}_trimmed{video_path.suffix}")
     _run_command(
@@ -227,30 +748,134 @@ def _trim_if_exceeds_limit(video_path: Path, max_duration_sec: float) -> None:
         ]
     )
     trimmed_path.replace(video_path)
+    return max_duration_sec
+
+
+def plan_video(job: dict[str, Any], timeline: Timeline | None = None) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    with stage_timer(timeline, "analyze"):
+        analysis = _analyze_image(job)
+    return analysis, _build_scene_plan(job, analysis)
+
+
+def render_segment(
+    image_path: Path,
+    segment_plan: dict[str, Any],
+    segment_path: Path,
+    segment_cache: SegmentStore | None = None,
+    image_digest: str = "",
+    timeline: Timeline | None = None,
+) -> bool:
+    segment_path.parent.mkdir(parents=True, exist_ok=True)
+    if segment_cache is not None and not image_digest:
+        image_digest = file_sha256(image_path)
+    threads = _resolve_ffmpeg_threads({}, _plan_render_profile(segment_plan))
+    outcome = _render_or_fetch_segment(
+        image_path, segment_plan, segment_path, threads, segment_cache, image_digest, timeline=timeline
+    )
+    return outcome in CACHED_OUTCOMES
 
 
-def generate_video_from_image(job: dict[str, Any]) -> dict[str, Any]:
+def finalize_segments(segment_paths: list[Path], output_path: Path, timeline: Timeline | None = None) -> float:
+    concat_list_path = output_path.parent / f"{output_path.stem}_segments.txt"
+    with stage_timer(timeline, "concat"):
+        _concat_segments(segment_paths, concat_list_path, output_path)
+    with stage_timer(timeline, "trim"):
+        return _trim_if_exceeds_limit(output_path, max_duration_sec=float(MAX_DURATION_SECONDS))
+
+
+def generate_video_from_image(
+    job: dict[str, Any],
+    segment_cache: SegmentStore | None = None,
+    progress_callback: ProgressCallback | None = None,
+    timeline: Timeline | None = None,
+    segment_callback: SegmentCallback | None = None,
+) -> dict[str, Any]:
     image_path = Path(job["image_path"])
     output_path = Path(job["output_path"])
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    analysis = _analyze_image(job)
-    scene_plan = _build_scene_plan(job, analysis)
-
-    segment_paths: list[Path] = []
-    for segment in scene_plan:
-        segment_path = output_path.parent / f"{output_path.stem}_seg_{segment['segment_index']:03d}.mp4"
-        _render_segment(image_path, segment, segment_path)
-        segment_paths.append(segment_path)
-
-    concat_list_path = output_path.parent / f"{output_path.stem}_segments.txt"
-    _concat_segments(segment_paths, concat_list_path, output_path)
-
-    _trim_if_exceeds_limit(output_path, max_duration_sec=float(MAX_DURATION_SECONDS))
+    analysis, scene_plan = plan_video(job, timeline)
+    timings: dict[str, float] = {}
+    frames_total = sum(_segment_frame_count(segment) for segment in scene_plan)
+    progress = _RenderProgress(frames_total, progress_callback) if progress_callback is not None else None
+
+    image_digest = ""
+    if segment_cache is not None:
+        image_digest = str(job.get("source_sha256") or "") or file_sha256(image_path)
+    stage_started = time.perf_counter()
+    with stage_timer(timeline, "prepare"):
+        prepared_path = prepare_source_image(image_path, output_path.parent / f"{output_path.stem}_source.ppm")
+    timings["prepare_sec"] = round(time.perf_counter() - stage_started, 3)
+
+    render_engine = str(job.get("render_engine") or "segments")
+    if render_engine not in RENDER_ENGINES:
+        raise ValueError(f"render_engine must be one of {', '.join(RENDER_ENGINES)}")
+
+    if render_engine == "single_pass" and _plan_frame_engine(scene_plan[0]) != "zoompan":
+        raise ValueError("render_engine 'single_pass' requires frame_engine 'zoompan'")
+
+    if render_engine == "single_pass" and segment_callback is not None:
+        raise ValueError("per-segment output requires render_engine 'segments'")
+
+    if render_engine == "single_pass":
+        threads = _resolve_ffmpeg_threads(job, _plan_render_profile(scene_plan[0]))
+        stage_started = time.perf_counter()
+        with stage_timer(timeline, "render_single_pass"):
+            final_duration = _render_single_pass(prepared_path, scene_plan, output_path, threads, progress)
+        timings["render_sec"] = round(time.perf_counter() - stage_started, 3)
+        render = {
+            "engine": render_engine,
+            "profile": _plan_render_profile(scene_plan[0]),
+            "concurrency": 1,
+            "ffmpeg_threads": threads,
+            "bytes_written": output_path.stat().st_size,
+        }
+    else:
+        segment_paths = [
+            output_path.parent / f"{output_path.stem}_seg_{segment['segment_index']:03d}.mp4" for segment in scene_plan
+        ]
+        concurrency, threads = _resolve_render_parallelism(job, scene_plan)
+        stage_started = time.perf_counter()
+        outcomes = _render_segments(
+            prepared_path,
+            scene_plan,
+            segment_paths,
+            concurrency,
+            threads,
+            segment_cache,
+            image_digest,
+            progress,
+            timeline,
+            segment_callback,
+        )
+        timings["render_sec"] = round(time.perf_counter() - stage_started, 3)
+        cache_hits = sum(outcome in CACHED_OUTCOMES for outcome in outcomes)
+
+        stage_started = time.perf_counter()
+        final_duration = finalize_segments(segment_paths, output_path, timeline)
+        timings["finalize_sec"] = round(time.perf_counter() - stage_started, 3)
+        render = {
+            "engine": render_engine,
+            "profile": _plan_render_profile(scene_plan[0]),
+            "frame_engine": _plan_frame_engine(scene_plan[0]),
+            "concurrency": concurrency,
+            "ffmpeg_threads": threads,
+            "cache_hits": cache_hits,
+            "cache_misses": len(scene_plan) - cache_hits if segment_cache is not None else 0,
+            "fallback_segments": [
+                segment["segment_index"]
+                for segment, outcome in zip(scene_plan, outcomes)
+                if outcome in FALLBACK_OUTCOMES
+            ],
+            # Intermediate segments plus the concatenated output; a trim pass would add one more copy.
+            "bytes_written": sum(path.stat().st_size for path in segment_paths) + output_path.stat().st_size,
+        }
 
     return {
         "output_path": str(output_path),
         "analysis": analysis,
         "segments": scene_plan,
-        "final_duration_sec": _probe_duration(output_path),
+        "final_duration_sec": final_duration,
+        "timings": timings,
+        "render": render,
     }
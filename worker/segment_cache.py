@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import Any
+
+from botocore.exceptions import BotoCoreError, ClientError
+from redis import Redis
+
+STATS_KEY = "segment-cache:stats"
+ACCESS_KEY = "segment-cache:access"
+SIZES_KEY = "segment-cache:sizes"
+EVICT_LOCK_KEY = "segment-cache:evict-lock"
+
+
+# Access times and sizes live in Redis so eviction never has to list the bucket.
+class SegmentCache:
+    # Shared across jobs, so it never serves (or keeps) the lower-quality fallback encodes.
+    keeps_fallbacks = False
+
+    def __init__(
+        self,
+        s3_client: Any,
+        redis_client: Redis,
+        bucket: str,
+        max_bytes: int,
+        max_age_seconds: int,
+        prefix: str = "segment-cache/",
+    ) -> None:
+        self.s3_client = s3_client
+        self.redis_client = redis_client
+        self.bucket = bucket
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.prefix = prefix
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.prefix}{key}.mp4"
+
+    def fetch(self, key: str, path: Path) -> bool:
+        try:
+            self.s3_client.download_file(self.bucket, self._object_key(key), str(path))
+        except (BotoCoreError, ClientError):
+            path.unlink(missing_ok=True)
+            self.redis_client.hincrby(STATS_KEY, "misses", 1)
+            return False
+
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.hincrby(STATS_KEY, "hits", 1)
+        pipe.zadd(ACCESS_KEY, {key: time.time()})
+        pipe.execute()
+        return True
+
+    def store(self, key: str, path: Path) -> None:
+        size = path.stat().st_size
+        try:
+            self.s3_client.upload_file(str(path), self.bucket, self._object_key(key))
+        except (BotoCoreError, ClientError):
+            return
+
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.zadd(ACCESS_KEY, {key: time.time()})
+        pipe.hset(SIZES_KEY, key, size)
+        pipe.execute()
+
+    def stats(self) -> dict[str, int]:
+        raw = self.redis_client.hgetall(STATS_KEY)
+        stats = {(k.decode() if isinstance(k, bytes) else str(k)): int(v) for k, v in raw.items()}
+        sizes = self.redis_client.hvals(SIZES_KEY)
+        stats["entries"] = len(sizes)
+        stats["bytes"] = sum(int(size) for size in sizes)
+        return stats
+
+    def evict(self) -> int:
+        expired = self.redis_client.zrangebyscore(ACCESS_KEY, "-inf", time.time() - self.max_age_seconds)
+        evicted = [key.decode() if isinstance(key, bytes) else str(key) for key in expired]
+
+        sizes = {
+            (key.decode() if isinstance(key, bytes) else str(key)): int(size)
+            for key, size in self.redis_client.hgetall(SIZES_KEY).items()
+        }
+        total_bytes = sum(size for key, size in sizes.items() if key not in evicted)
+        if total_bytes > self.max_bytes:
+            for raw_key in self.redis_client.zrange(ACCESS_KEY, 0, -1):
+                key = raw_key.decode() if isinstance(raw_key, bytes) else str(raw_key)
+                if key in evicted:
+                    continue
+                evicted.append(key)
+                total_bytes -= sizes.get(key, 0)
+                if total_bytes <= self.max_bytes:
+                    break
+
+        for start in range(0, len(evicted), 1000):
+            batch = evicted[start : start + 1000]
+            self.s3_client.delete_objects(
+                Bucket=self.bucket,
+                Delete={"Objects": [{"Key": self._object_key(key)} for key in batch], "Quiet": True},
+            )
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.zrem(ACCESS_KEY, *batch)
+            pipe.hdel(SIZES_KEY, *batch)
+            pipe.hincrby(STATS_KEY, "evictions", len(batch))
+            pipe.execute()
+        return len(evicted)
+
+    def evict_if_due(self, interval_seconds: int) -> int:
+        if not self.redis_client.set(EVICT_LOCK_KEY, 1, nx=True, ex=interval_seconds):
+            return 0
+        return self.evict()
+
+
+# Finished segments of one job, kept until the job ends so an RQ retry renders only what is missing.
+# Same fetch/store interface as SegmentCache, which already keeps every segment when it is enabled.
+class SegmentCheckpoints:
+    keeps_fallbacks = True
+
+    def __init__(self, s3_client: Any, bucket: str, prefix: str) -> None:
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.prefix}{key}.mp4"
+
+    def fetch(self, key: str, path: Path) -> bool:
+        try:
+            self.s3_client.download_file(self.bucket, self._object_key(key), str(path))
+        except (BotoCoreError, ClientError):
+            path.unlink(missing_ok=True)
+            return False
+        return True
+
+    def store(self, key: str, path: Path) -> None:
+        try:
+            self.s3_client.upload_file(str(path), self.bucket, self._object_key(key))
+        except (BotoCoreError, ClientError):
+            # Only a retry would have used it; the segment itself is fine.
+            pass
+
+    def clear(self) -> None:
+        delete_prefix(self.s3_client, self.bucket, self.prefix)
+
+
+def delete_prefix(s3_client: Any, bucket: str, prefix: str) -> None:
+    paginator = s3_client.get_paginator("list_objects_v2")
+    try:
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+            objects = [{"Key": item["Key"]} for item in page.get("Contents", [])]
+            if objects:
+                s3_client.delete_objects(Bucket=bucket, Delete={"Objects": objects, "Quiet": True})
+    except (BotoCoreError, ClientError):
+        # Leftovers cost storage only; a bucket lifecycle rule on the prefix can expire them.
+        pass